@@ -0,0 +1,69 @@
+"""Compare the prompt tokens of every model call with and without context compaction.
+
+Usage: python -m benchmarks.context_compaction --paragraphs 40
+"""
+
+import argparse
+import asyncio
+import os
+from itertools import zip_longest
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from devtools.fake_llm import FakeNewsChatModel  # noqa: E402
+from workflows.news_workflow import NewsWorkflow  # noqa: E402
+
+SHORT_ARTICLE = "Lionel Messi is in talks about a transfer this summer."
+PARAGRAPH = (
+    "Lionel Messi is in talks about a transfer this summer. Several sides have "
+    "asked about the forward, and his advisers met sporting directors this week. "
+    "No decision is expected before the end of the season."
+)
+
+
+async def run(article: str, compact_context: bool):
+    fake_llm = FakeNewsChatModel()
+    news_workflow = NewsWorkflow(llm=fake_llm, compact_context=compact_context)
+    result = await news_workflow.ainvoke({"article": article})
+    return result, [call["prompt_tokens"] for call in fake_llm.call_log]
+
+
+def print_calls(name: str, baseline: list, compacted: list):
+    print(f"\n{name}")
+    print(f"{'call':<6}{'baseline':>10}{'compacted':>11}{'reduction':>11}")
+    for number, (before, after) in enumerate(
+        zip_longest(baseline, compacted, fillvalue=0), start=1
+    ):
+        reduction = f"{1 - after / before:.0%}" if before else "-"
+        print(f"{number:<6}{before:>10}{after:>11}{reduction:>11}")
+    total_before, total_after = sum(baseline), sum(compacted)
+    print(
+        f"{'total':<6}{total_before:>10}{total_after:>11}"
+        f"{1 - total_after / total_before:>11.0%}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--paragraphs",
+        type=int,
+        default=40,
+        help="length of the long article, which exceeds the researchers' limit",
+    )
+    args = parser.parse_args()
+
+    scenarios = {
+        "short article (rewritten to 100 words)": SHORT_ARTICLE,
+        f"long article ({args.paragraphs} paragraphs)": " ".join(
+            [PARAGRAPH] * args.paragraphs
+        ),
+    }
+    for name, article in scenarios.items():
+        _, baseline = await run(article, compact_context=False)
+        _, compacted = await run(article, compact_context=True)
+        print_calls(name, baseline, compacted)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
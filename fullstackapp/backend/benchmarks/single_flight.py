@@ -0,0 +1,75 @@
+"""Compare LLM calls with and without single-flight under duplicate-heavy load.
+
+Usage: python -m benchmarks.single_flight --requests 200 --unique 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from devtools.fake_llm import FakeNewsChatModel  # noqa: E402
+from devtools.loadtest import scheduler_limits  # noqa: E402
+from workflows.llm_scheduler import default_scheduler  # noqa: E402
+from workflows.news_workflow import NewsWorkflow  # noqa: E402
+from workflows.single_flight import SingleFlight  # noqa: E402
+
+PLAYERS = ["Lionel Messi", "Cristiano Ronaldo", "Kylian Mbappe", "Erling Haaland"]
+
+
+def make_articles(requests: int, unique: int, seed: int = 0):
+    rng = random.Random(seed)
+    distinct = [
+        f"{PLAYERS[i % len(PLAYERS)]} is in talks about a transfer (report {i})."
+        for i in range(unique)
+    ]
+    return [rng.choice(distinct) for _ in range(requests)]
+
+
+async def run(articles, coalesce: bool, latency: float):
+    fake_llm = FakeNewsChatModel(latency=latency)
+    single_flight = SingleFlight() if coalesce else None
+    news_workflow = NewsWorkflow(llm=fake_llm, single_flight=single_flight)
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(news_workflow.ainvoke({"article": article}) for article in articles)
+    )
+    return {
+        "llm_calls": fake_llm.calls,
+        "prompt_tokens": fake_llm.prompt_tokens,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--unique", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--llm-requests-per-minute", type=float, default=100_000)
+    parser.add_argument("--llm-max-concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    articles = make_articles(args.requests, args.unique)
+    # Every model call goes through the process-wide scheduler. Its production
+    # rate limit would dominate the timings, so it is raised like in the
+    # load test.
+    with scheduler_limits(
+        default_scheduler, args.llm_requests_per_minute, args.llm_max_concurrency
+    ):
+        baseline = await run(articles, coalesce=False, latency=args.latency)
+        coalesced = await run(articles, coalesce=True, latency=args.latency)
+    print(f"requests={args.requests} unique_articles={args.unique}")
+    print(f"{'mode':<14}{'llm_calls':>10}{'prompt_tokens':>15}{'seconds':>10}")
+    for mode, result in (("baseline", baseline), ("single-flight", coalesced)):
+        print(
+            f"{mode:<14}{result['llm_calls']:>10}"
+            f"{result['prompt_tokens']:>15}{result['seconds']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,210 @@
+import asyncio
+import json
+import re
+import time
+from typing import Any, List, Optional
+from uuid import uuid4
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+PLAYER_PATTERN = re.compile(r"[A-Z][\w'\-]*(?:\s+[A-Z][\w'\-]*)+")
+CURRENCY_PATTERN = re.compile(r"[€$£]\s?\d|\d+\s?(million|bn|billion|m)\b", re.I)
+TRANSFER_KEYWORDS = ("transfer", "club", "sign", "football", "market value", "contract")
+CLUB_KEYWORDS = ("club", "plays for", "fc", "current club information not available")
+FILLER_SENTENCE = (
+    "Supporters and analysts alike are following the story closely, weighing "
+    "what the move could mean for the player, the squad and the wider league."
+)
+
+
+def count_tokens(text: str) -> int:
+    """Approximate a tokenizer by counting words and punctuation marks."""
+    return len(TOKEN_PATTERN.findall(text or ""))
+
+
+def _message_text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return " ".join(str(part) for part in content)
+
+
+class FakeNewsChatModel(BaseChatModel):
+    """Offline chat model that answers the news workflow prompts.
+
+    Supports ``bind_tools`` and ``with_structured_output`` and counts the
+    prompt and completion tokens of every call so tests and benchmarks can
+    compare prompt sizes without network access.
+    """
+
+    latency: float = 0.0
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    call_log: List[dict] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-news-chat-model"
+
+    def reset_usage(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.call_log = []
+
+    def bind_tools(self, tools, *, tool_choice: Optional[str] = None, **kwargs):
+        return self.bind(
+            tools=[convert_to_openai_tool(tool) for tool in tools],
+            tool_choice=tool_choice,
+            **kwargs,
+        )
+
+    def _structured_args(self, schema: dict, text: str) -> dict:
+        properties = schema.get("parameters", {}).get("properties", {})
+        lowered = text.lower()
+        answers = {
+            "off_or_ontopic": any(word in lowered for word in TRANSFER_KEYWORDS),
+            "mentions_market_value": "market value" in lowered
+            or bool(CURRENCY_PATTERN.search(text)),
+            "mentions_current_club": any(word in lowered for word in CLUB_KEYWORDS),
+            "meets_100_words": len(text.split()) >= 100,
+        }
+        args = {}
+        for name in properties:
+            if name in answers:
+                args[name] = "yes" if answers[name] else "no"
+            elif name == "players":
+                args[name] = [
+                    {"player_name": player} for player in PLAYER_PATTERN.findall(text)
+                ]
+            else:
+                args[name] = ""
+        return args
+
+    def _respond(self, messages: List[BaseMessage], tools, tool_choice) -> AIMessage:
+        text = _message_text(messages[-1])
+        if tools and tool_choice:
+            tool = tools[0]["function"]
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": tool["name"],
+                        "args": self._structured_args(tool, text),
+                        "id": f"call_{uuid4().hex}",
+                    }
+                ],
+            )
+        if tools:
+            if isinstance(messages[-1], ToolMessage):
+                if "club" in (messages[-1].name or ""):
+                    return AIMessage(content=f"The current club is {text}")
+                return AIMessage(content=f"The market value is {text}")
+            players = PLAYER_PATTERN.findall(text)
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": tools[0]["function"]["name"],
+                        "args": {"player_name": players[0] if players else ""},
+                        "id": f"call_{uuid4().hex}",
+                    }
+                ],
+            )
+        expanded = text
+        while len(expanded.split()) < 100:
+            expanded += f" {FILLER_SENTENCE}"
+        return AIMessage(content=expanded)
+
+    def _record(self, messages: List[BaseMessage], response: AIMessage, tools):
+        prompt_tokens = sum(count_tokens(_message_text(m)) for m in messages)
+        if tools:
+            prompt_tokens += count_tokens(json.dumps(tools))
+        completion_tokens = count_tokens(_message_text(response)) + sum(
+            count_tokens(str(call["args"])) for call in response.tool_calls
+        )
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.call_log.append(
+            {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+        )
+        response.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tools = kwargs.get("tools")
+        response = self._respond(messages, tools, kwargs.get("tool_choice"))
+        self._record(messages, response, tools)
+        return ChatResult(generations=[ChatGeneration(message=response)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._generate(messages, stop=stop, **kwargs)
+
+
+class FakeRateLimitError(Exception):
+    """429 raised by ``RateLimitedFakeChatModel``, shaped like ``openai.RateLimitError``."""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__("Rate limit exceeded")
+        self.retry_after = retry_after
+
+
+class RateLimitedFakeChatModel(FakeNewsChatModel):
+    """Fake provider that enforces a request window and a concurrency cap."""
+
+    requests_per_window: int = 10
+    window: float = 1.0
+    max_concurrency: int = 4
+    rejected: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    request_times: List[float] = []
+
+    def _admit(self):
+        now = time.monotonic()
+        self.request_times = [t for t in self.request_times if now - t < self.window]
+        if (
+            len(self.request_times) >= self.requests_per_window
+            or self.in_flight >= self.max_concurrency
+        ):
+            self.rejected += 1
+            oldest = self.request_times[0] if self.request_times else now
+            raise FakeRateLimitError(
+                retry_after=max(self.window - (now - oldest), 0.01)
+            )
+        self.request_times.append(now)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self._admit()
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await super()._agenerate(messages, stop=stop, **kwargs)
+        finally:
+            self.in_flight -= 1
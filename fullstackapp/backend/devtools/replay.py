@@ -0,0 +1,379 @@
+"""Export a thread's checkpoints and LLM responses and replay them offline.
+
+Recording has to be switched on in app.py with RECORD_LLM_CALLS=1, which
+stores every model response of a thread next to its checkpoints. Record
+with NODE_CACHE unset: cached grading steps make no model call, so the
+replay would run out of responses. A coalesced run (single-flight) is
+recorded only for the thread that started it.
+
+Usage:
+    python -m devtools.replay export --postgres-url postgresql://... \
+        --thread-id <thread_id> --out tests/fixtures/<name>.json
+    python -m devtools.replay run tests/fixtures/<name>.json --repeat 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+from uuid import UUID
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-replay")
+
+from langchain_core.callbacks import BaseCallbackHandler  # noqa: E402
+from langchain_core.language_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, messages_from_dict  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+from langchain_core.runnables import RunnableLambda  # noqa: E402
+from langchain_core.utils.function_calling import convert_to_openai_tool  # noqa: E402
+from langgraph.checkpoint.base import BaseCheckpointSaver  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+from langgraph.store.base import BaseStore  # noqa: E402
+from workflows.human_workflow import HumanWorkflow  # noqa: E402
+from workflows.llm_recorder import (  # noqa: E402
+    LLM_RECORDINGS_NAMESPACE,
+    prompt_fingerprint,
+)
+from workflows.player_memory import PlayerFacts, PlayerMemory  # noqa: E402
+
+FIXTURE_VERSION = 1
+RECORDED_FIELDS = ("question", "answer", "error", "confirmed")
+
+
+class ExportError(ValueError):
+    """The thread can't be turned into a replay fixture."""
+
+
+class ReplayMismatch(Exception):
+    """The current code asked for more model calls than were recorded."""
+
+
+class ReplayChatModel(BaseChatModel):
+    """Answers every call with a recorded response.
+
+    A call gets the first unused response recorded for the same prompt, so
+    nodes that ran concurrently may finish in a different order. Calls whose
+    prompt was not recorded take the next unused response and are counted in
+    ``prompt_mismatches``.
+    """
+
+    calls: List[dict]
+    used: List[bool] = []
+    position: int = 0
+    prompt_mismatches: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay-chat-model"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(
+            tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs
+        )
+
+    def with_structured_output(self, schema, **kwargs):
+        # Responses recorded from ChatOpenAI carry the JSON in the content,
+        # those from function-calling models in the first tool call.
+        def parse(message: AIMessage):
+            if message.tool_calls:
+                return schema.model_validate(message.tool_calls[0]["args"])
+            return schema.model_validate_json(message.content)
+
+        return self.bind() | RunnableLambda(parse)
+
+    def _next_response(self, prompt: str) -> dict:
+        if not self.used:
+            self.used = [False] * len(self.calls)
+        unused = [i for i, used in enumerate(self.used) if not used]
+        if not unused:
+            raise ReplayMismatch(
+                f"Model call {self.position + 1} was not recorded "
+                f"({len(self.calls)} recorded)."
+            )
+        index = next((i for i in unused if self.calls[i].get("prompt") == prompt), None)
+        if index is None:
+            self.prompt_mismatches += 1
+            index = unused[0]
+        self.used[index] = True
+        self.position += 1
+        return self.calls[index]["response"]
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        (message,) = messages_from_dict(
+            [self._next_response(prompt_fingerprint(messages))]
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return self._generate(messages, stop=stop, **kwargs)
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Wall time spent in every graph node, subgraph nodes included."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.samples_ms: Dict[str, List[float]] = defaultdict(list)
+        self._started: Dict[UUID, tuple] = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        name = kwargs.get("name")
+        if name and (metadata or {}).get("langgraph_node") == name:
+            self._started[run_id] = (name, time.perf_counter())
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        if run_id in self._started:
+            name, started = self._started.pop(run_id)
+            self.samples_ms[name].append((time.perf_counter() - started) * 1000)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self.on_chain_end(None, run_id=run_id)
+
+
+def _checkpoint_record(snapshot) -> dict:
+    return {
+        "step": snapshot.metadata.get("step"),
+        "source": snapshot.metadata.get("source"),
+        "next": list(snapshot.next),
+        "values": {
+            field: snapshot.values[field]
+            for field in RECORDED_FIELDS
+            if field in snapshot.values
+        },
+    }
+
+
+async def export_thread(
+    checkpointer: BaseCheckpointSaver, store: BaseStore, thread_id: str
+) -> dict:
+    """Build a replay fixture from a thread's checkpoint history."""
+    workflow = HumanWorkflow(llm=ReplayChatModel(calls=[]))
+    workflow.set_checkpointer(checkpointer)
+    config = {"configurable": {"thread_id": thread_id}}
+    history = [
+        snapshot async for snapshot in workflow.workflow.aget_state_history(config)
+    ]
+    if not history:
+        raise ExportError(f"Thread {thread_id} has no checkpoints.")
+    checkpoints = [_checkpoint_record(snapshot) for snapshot in reversed(history)]
+
+    recorded = await store.aget(LLM_RECORDINGS_NAMESPACE, thread_id)
+    calls = recorded.value["calls"] if recorded else []
+    answered = any(
+        c["source"] == "loop" and "answer" in c["values"] for c in checkpoints
+    )
+    if answered and not calls:
+        raise ExportError(
+            f"Thread {thread_id} ran newsagent_node but has no recorded model "
+            "calls. Record with RECORD_LLM_CALLS=1 and NODE_CACHE unset; a run "
+            "coalesced with another thread's is only recorded for that thread."
+        )
+    question = next(
+        (c["values"]["question"] for c in checkpoints if "question" in c["values"]), ""
+    )
+    # Researcher nodes answer from player memory before calling a model, so
+    # the facts known for this article are part of the recorded run.
+    player_memory = [
+        {key: value for key, value in facts.items() if key != "updated_at"}
+        for facts in await PlayerMemory(store=store).arecall(question)
+    ]
+    return {
+        "version": FIXTURE_VERSION,
+        "thread_id": thread_id,
+        "checkpoints": checkpoints,
+        "player_memory": player_memory,
+        "llm_calls": calls,
+    }
+
+
+class ReplayReport:
+    def __init__(self, fixture: dict):
+        self.fixture = fixture
+        self.runs = 0
+        self.mismatches: List[str] = []
+        self.prompt_mismatches = 0
+        self.llm_calls = 0
+        self.run_ms: List[float] = []
+        self.node_ms: Dict[str, List[float]] = defaultdict(list)
+
+    @property
+    def matches(self) -> bool:
+        return not self.mismatches
+
+    def summary(self) -> dict:
+        nodes = {
+            node: {
+                "calls": len(samples),
+                "total_ms": round(sum(samples), 3),
+                "mean_ms": round(sum(samples) / len(samples), 3),
+            }
+            for node, samples in sorted(self.node_ms.items())
+        }
+        return {
+            "thread_id": self.fixture["thread_id"],
+            "runs": self.runs,
+            "matches": self.matches,
+            "mismatches": self.mismatches,
+            "llm_calls_per_run": self.llm_calls // max(self.runs, 1),
+            "prompt_mismatches": self.prompt_mismatches,
+            "mean_run_ms": round(sum(self.run_ms) / max(len(self.run_ms), 1), 3),
+            "nodes": nodes,
+        }
+
+    def print(self):
+        summary = self.summary()
+        print(
+            f"thread={summary['thread_id']} runs={summary['runs']} "
+            f"matches={summary['matches']} mean_run_ms={summary['mean_run_ms']} "
+            f"llm_calls={summary['llm_calls_per_run']} "
+            f"prompt_mismatches={summary['prompt_mismatches']}"
+        )
+        for mismatch in summary["mismatches"]:
+            print(f"mismatch: {mismatch}")
+        print(f"{'node':<28}{'calls':>7}{'total ms':>11}{'mean ms':>10}")
+        for node, stats in summary["nodes"].items():
+            print(
+                f"{node:<28}{stats['calls']:>7}{stats['total_ms']:>11}"
+                f"{stats['mean_ms']:>10}"
+            )
+
+
+def _replay_script(checkpoints: List[dict]) -> tuple:
+    """Recover the editor's actions: the question, the edits, the confirm."""
+    question = next(
+        c["values"]["question"] for c in checkpoints if "question" in c["values"]
+    )
+    edits = [c["values"]["answer"] for c in checkpoints if c["source"] == "update"]
+    confirmed = any("confirm_node" in c["next"] for c in checkpoints) and (
+        checkpoints[-1]["next"] == []
+    )
+    return question, edits, confirmed
+
+
+async def replay_once(fixture: dict, report: ReplayReport):
+    calls = fixture["llm_calls"]
+    llm = ReplayChatModel(calls=calls)
+    workflow = HumanWorkflow(llm=llm)
+    workflow.set_checkpointer(InMemorySaver())
+    await workflow.memory.aremember(
+        [PlayerFacts(**facts) for facts in fixture["player_memory"]]
+    )
+    timer = NodeTimer()
+    config = {
+        "configurable": {"thread_id": fixture["thread_id"]},
+        "callbacks": [timer],
+    }
+    question, edits, confirmed = _replay_script(fixture["checkpoints"])
+
+    started = time.perf_counter()
+    await workflow.ainvoke({"question": question}, {**config, "recursion_limit": 15})
+    for answer in edits:
+        await workflow.workflow.aupdate_state(config, {"answer": answer})
+    if confirmed:
+        await workflow.ainvoke(None, config)
+    report.run_ms.append((time.perf_counter() - started) * 1000)
+
+    values = (await workflow.workflow.aget_state(config)).values
+    for field, expected in fixture["checkpoints"][-1]["values"].items():
+        if values.get(field) != expected:
+            report.mismatches.append(
+                f"{field}: expected {expected!r}, got {values.get(field)!r}"
+            )
+    if llm.position != len(calls):
+        report.mismatches.append(
+            f"{len(calls) - llm.position} of {len(calls)} recorded model calls unused"
+        )
+    report.runs += 1
+    report.llm_calls += llm.position
+    report.prompt_mismatches += llm.prompt_mismatches
+    for node, samples in timer.samples_ms.items():
+        report.node_ms[node].extend(samples)
+
+
+async def replay_fixture(fixture: dict, repeat: int = 1) -> ReplayReport:
+    """Replay ``fixture`` ``repeat`` times against the current workflow code."""
+    if fixture.get("version") != FIXTURE_VERSION:
+        raise ValueError(f"Unsupported fixture version: {fixture.get('version')}")
+    report = ReplayReport(fixture)
+    for _ in range(repeat):
+        try:
+            await replay_once(fixture, report)
+        except ReplayMismatch as e:
+            report.mismatches.append(str(e))
+            break
+    return report
+
+
+def load_fixture(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_fixture(fixture: dict, path: str):
+    with open(path, "w") as file:
+        json.dump(fixture, file, indent=1, ensure_ascii=False)
+        file.write("\n")
+
+
+async def export_from_postgres(postgres_url: str, thread_id: str) -> dict:
+    from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+    from langgraph.store.postgres.aio import AsyncPostgresStore
+
+    async with AsyncPostgresSaver.from_conn_string(
+        postgres_url
+    ) as checkpointer, AsyncPostgresStore.from_conn_string(postgres_url) as store:
+        return await export_thread(checkpointer, store, thread_id)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="write a thread to a fixture")
+    export.add_argument("--postgres-url", required=True)
+    export.add_argument("--thread-id", required=True)
+    export.add_argument("--out", required=True)
+    run = commands.add_parser("run", help="replay a fixture and time every node")
+    run.add_argument("fixture")
+    run.add_argument("--repeat", type=int, default=1)
+    run.add_argument(
+        "--max-mean-run-ms",
+        type=float,
+        help="fail when a replayed run takes longer than this on average",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        try:
+            fixture = asyncio.run(
+                export_from_postgres(args.postgres_url, args.thread_id)
+            )
+        except ExportError as e:
+            print(e, file=sys.stderr)
+            return 1
+        save_fixture(fixture, args.out)
+        print(
+            f"wrote {args.out}: {len(fixture['checkpoints'])} checkpoints, "
+            f"{len(fixture['llm_calls'])} model calls"
+        )
+        return 0
+
+    report = asyncio.run(replay_fixture(load_fixture(args.fixture), args.repeat))
+    report.print()
+    if not report.matches:
+        return 1
+    mean_run_ms = report.summary()["mean_run_ms"]
+    if args.max_mean_run_ms is not None and mean_run_ms > args.max_mean_run_ms:
+        print(f"mean run {mean_run_ms}ms exceeds {args.max_mean_run_ms}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+import pytest_asyncio
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+import app as backend  # noqa: E402
+import httpx  # noqa: E402
+from devtools.fake_llm import FakeNewsChatModel  # noqa: E402
+from langgraph.checkpoint.memory import InMemorySaver  # noqa: E402
+from langgraph.store.memory import InMemoryStore  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from workflows.human_workflow import HumanWorkflow  # noqa: E402
+from workflows.player_memory import PlayerMemory  # noqa: E402
+
+
+@pytest.fixture
+def player_memory():
+    """
+    Fixture for a PlayerMemory backed by a fresh in-memory store.
+    """
+    return PlayerMemory(store=InMemoryStore())
+
+
+@pytest.fixture
+def fake_llm():
+    """
+    Fixture for the offline, token-counting chat model.
+    """
+    return FakeNewsChatModel()
+
+
+@pytest.fixture
+def human_workflow(fake_llm):
+    """
+    Fixture for a HumanWorkflow running on the fake model and an in-memory saver.
+    """
+    workflow = HumanWorkflow(llm=fake_llm)
+    workflow.set_checkpointer(InMemorySaver())
+    return workflow
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """
+    Fixture for sessions on a SQLite copy of the threads table.
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'threads.db'}",
+        connect_args={"check_same_thread": False},
+    )
+    backend.Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def api(human_workflow, session_factory):
+    """
+    Fixture for an HTTP client talking to app.py without Postgres.
+    """
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    original_workflow = backend.human_workflow
+    backend.human_workflow = human_workflow
+    backend.app.dependency_overrides[backend.get_db] = get_db
+    transport = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    backend.human_workflow = original_workflow
+    backend.app.dependency_overrides.pop(backend.get_db, None)
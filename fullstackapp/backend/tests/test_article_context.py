@@ -0,0 +1,119 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from workflows.article_context import (
+    cap_message_history,
+    compact_article,
+    dedupe_facts,
+    estimate_text_tokens,
+    truncate_to_tokens,
+)
+from workflows.news_workflow import NewsWorkflow
+
+ARTICLE = "Lionel Messi is in talks about a transfer this summer."
+PARAGRAPH = (
+    "Lionel Messi is in talks about a transfer this summer. Several sides have "
+    "asked about the forward, and his advisers met sporting directors this week. "
+    "No decision is expected before the end of the season."
+)
+
+
+def test_dedupe_facts():
+    """
+    Test that snippets stated in the article or an earlier fact are dropped.
+    """
+    facts = [
+        "The market value is €50 million.",
+        " the market value is €50 million ",
+        "",
+        "Lionel Messi is in talks about a transfer.",
+        "He plays for Inter Miami.",
+    ]
+
+    assert dedupe_facts(ARTICLE, facts) == [
+        "The market value is €50 million.",
+        "He plays for Inter Miami.",
+    ]
+
+
+def test_truncate_to_tokens_keeps_leading_sentences():
+    """
+    Test that truncation cuts at sentence boundaries within the budget.
+    """
+    text = "First sentence here. Second sentence here. Third sentence here."
+
+    assert truncate_to_tokens(text, 11) == "First sentence here. Second sentence here."
+    assert truncate_to_tokens(text, 3) == "First"
+    assert truncate_to_tokens(text, None) == text
+
+
+def test_compact_article_shortens_the_article_before_the_facts():
+    """
+    Test that the facts survive when the context has to be capped.
+    """
+    article = " ".join([PARAGRAPH] * 10)
+    facts = ["The market value is €50 million."]
+
+    context = compact_article(article, facts, max_tokens=100)
+
+    assert estimate_text_tokens(context) <= 100
+    assert context.startswith("Lionel Messi is in talks")
+    assert context.endswith("The market value is €50 million.")
+    assert compact_article(ARTICLE, facts) == f"{ARTICLE} {facts[0]}"
+
+
+def test_cap_message_history_keeps_tool_messages():
+    """
+    Test that only the article message is shortened in a tool loop.
+    """
+    tool_call = {"name": "get_market_value", "args": {}, "id": "call_1"}
+    messages = [
+        HumanMessage(content=" ".join([PARAGRAPH] * 10)),
+        AIMessage(content="", tool_calls=[tool_call]),
+        ToolMessage(content="€50 million", tool_call_id="call_1"),
+    ]
+
+    capped = cap_message_history(messages, max_tokens=100)
+
+    assert sum(estimate_text_tokens(str(m.content)) for m in capped) <= 100
+    assert capped[1:] == messages[1:]
+    assert messages[0].content == " ".join([PARAGRAPH] * 10)
+
+
+@pytest.mark.asyncio
+async def test_compaction_sends_fewer_prompt_tokens(fake_llm):
+    """
+    Test that compaction reaches the same article with fewer prompt tokens.
+    """
+    results = {}
+    prompt_tokens = {}
+    for compact_context in (False, True):
+        fake_llm.reset_usage()
+        news_workflow = NewsWorkflow(llm=fake_llm, compact_context=compact_context)
+        results[compact_context] = await news_workflow.ainvoke({"article": ARTICLE})
+        prompt_tokens[compact_context] = fake_llm.prompt_tokens
+
+    assert results[True] == results[False]
+    assert prompt_tokens[True] < prompt_tokens[False]
+
+
+@pytest.mark.asyncio
+async def test_researchers_are_sent_at_most_their_limit(fake_llm):
+    """
+    Test that every researcher call of a long article stays within its token limit.
+    """
+    article = " ".join([PARAGRAPH] * 40)
+    news_workflow = NewsWorkflow(
+        llm=fake_llm, context_token_limits={"market_value": 200}
+    )
+    news_workflow.market_value_agent = AsyncMock(wraps=news_workflow.market_value_agent)
+
+    await news_workflow.ainvoke({"article": article})
+    sent = [
+        call.args[0]["article"]
+        for call in news_workflow.market_value_agent.ainvoke.await_args_list
+    ]
+
+    assert sent
+    assert all(estimate_text_tokens(context) <= 200 for context in sent)
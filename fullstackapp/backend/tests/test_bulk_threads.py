@@ -0,0 +1,191 @@
+import asyncio
+import json
+
+import app as backend
+import pytest
+from sqlalchemy import event
+
+ARTICLE = "Lionel Messi is in talks about a transfer this summer."
+
+
+async def asked_threads(api, count):
+    thread_ids = []
+    for _ in range(count):
+        thread_id = (await api.post("/start_thread")).json()["thread_id"]
+        await api.post(f"/ask_question/{thread_id}", json={"question": ARTICLE})
+        thread_ids.append(thread_id)
+    return thread_ids
+
+
+class StatementCounter:
+    """
+    Counts SELECTs and commits on the threads engine.
+    """
+
+    def __init__(self, engine):
+        self.selects = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_execute(self, conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.selects += 1
+
+    def _on_commit(self, conn):
+        self.commits += 1
+
+
+@pytest.mark.asyncio
+async def test_confirm_threads_validates_once_and_commits_once(api, session_factory):
+    """
+    Test that a batch confirm uses one IN query per phase and a single commit.
+    """
+    thread_ids = await asked_threads(api, 5)
+    counter = StatementCounter(session_factory.kw["bind"])
+
+    response = await api.post("/confirm_threads", json={"thread_ids": thread_ids})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["failed"] == []
+    assert [thread["thread_id"] for thread in body["threads"]] == thread_ids
+    assert all(thread["confirmed"] for thread in body["threads"])
+    assert counter.selects == 2
+    assert counter.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_confirm_threads_resumes_under_the_concurrency_limit(
+    api, human_workflow, monkeypatch
+):
+    """
+    Test that no more than BULK_CONCURRENCY graphs are resumed at once.
+    """
+    thread_ids = await asked_threads(api, 6)
+    monkeypatch.setattr(backend, "BULK_CONCURRENCY", 2)
+    resume = human_workflow.ainvoke
+    running, peak = 0, 0
+
+    async def tracked_resume(*args, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        try:
+            await asyncio.sleep(0.01)
+            return await resume(*args, **kwargs)
+        finally:
+            running -= 1
+
+    monkeypatch.setattr(human_workflow, "ainvoke", tracked_resume)
+
+    response = await api.post("/confirm_threads", json={"thread_ids": thread_ids})
+
+    assert len(response.json()["threads"]) == 6
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_confirm_threads_rejects_unknown_ids(api, human_workflow, monkeypatch):
+    """
+    Test that an unknown thread fails the batch before any graph is resumed.
+    """
+    thread_ids = await asked_threads(api, 2)
+    monkeypatch.setattr(human_workflow, "ainvoke", None)
+
+    response = await api.post(
+        "/confirm_threads", json={"thread_ids": [*thread_ids, "unknown"]}
+    )
+
+    assert response.status_code == 404
+    assert "unknown" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_confirm_threads_reports_failed_runs(api, human_workflow, monkeypatch):
+    """
+    Test that a failing resume is reported while the others are still committed.
+    """
+    thread_ids = await asked_threads(api, 3)
+    resume = human_workflow.ainvoke
+
+    async def flaky_resume(*args, config, **kwargs):
+        if config["configurable"]["thread_id"] == thread_ids[1]:
+            raise RuntimeError("checkpointer unavailable")
+        return await resume(*args, config=config, **kwargs)
+
+    monkeypatch.setattr(human_workflow, "ainvoke", flaky_resume)
+
+    body = (await api.post("/confirm_threads", json={"thread_ids": thread_ids})).json()
+    sessions = {
+        thread["thread_id"]: thread for thread in (await api.get("/sessions")).json()
+    }
+
+    assert [failure["thread_id"] for failure in body["failed"]] == [thread_ids[1]]
+    assert [sessions[thread_id]["confirmed"] for thread_id in thread_ids] == [
+        True,
+        False,
+        True,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_delete_threads(api, session_factory):
+    """
+    Test that a batch delete removes every thread in one transaction.
+    """
+    thread_ids = [
+        (await api.post("/start_thread")).json()["thread_id"] for _ in range(3)
+    ]
+    counter = StatementCounter(session_factory.kw["bind"])
+
+    response = await api.post("/delete_threads", json={"thread_ids": thread_ids[:2]})
+
+    assert response.status_code == 200
+    assert len(response.json()["threads"]) == 2
+    assert counter.commits == 1
+    remaining = [thread["thread_id"] for thread in (await api.get("/sessions")).json()]
+    assert remaining == thread_ids[2:]
+
+
+@pytest.mark.asyncio
+async def test_export_streams_ndjson(api, monkeypatch):
+    """
+    Test that the export streams one JSON line per thread across batches.
+    """
+    monkeypatch.setattr(backend, "EXPORT_BATCH_SIZE", 2)
+    thread_ids = [
+        (await api.post("/start_thread")).json()["thread_id"] for _ in range(5)
+    ]
+
+    async with api.stream("GET", "/sessions/export") as response:
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) async for line in response.aiter_lines() if line]
+
+    assert sorted(line["thread_id"] for line in lines) == sorted(thread_ids)
+    assert all(line["question_asked"] is False for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_confirm_threads_shares_one_deadline(api, human_workflow, monkeypatch):
+    """
+    Test that queued resumes count against the batch's deadline, not their own.
+    """
+    thread_ids = await asked_threads(api, 4)
+    monkeypatch.setattr(backend, "BULK_CONCURRENCY", 1)
+    monkeypatch.setattr(backend, "REQUEST_DEADLINE_SECONDS", 0.3)
+    resume = human_workflow.ainvoke
+
+    async def slow_resume(*args, **kwargs):
+        await asyncio.sleep(0.2)
+        return await resume(*args, **kwargs)
+
+    monkeypatch.setattr(human_workflow, "ainvoke", slow_resume)
+
+    body = (await api.post("/confirm_threads", json={"thread_ids": thread_ids})).json()
+
+    assert [thread["thread_id"] for thread in body["threads"]] == thread_ids[:1]
+    assert [failure["thread_id"] for failure in body["failed"]] == thread_ids[1:]
+    assert {failure["detail"] for failure in body["failed"]} == {
+        "Request deadline exceeded."
+    }
@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import app as backend
+import pytest
+from workflows.llm_scheduler import default_scheduler
+
+ARTICLE = "Lionel Messi is in talks about a transfer this summer."
+
+
+async def ask_and_disconnect(thread_id, disconnect_after):
+    """
+    Call ask_question over raw ASGI and drop the connection mid-request.
+    """
+    disconnected = asyncio.Event()
+    body_sent = False
+    messages = []
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            body = json.dumps({"question": ARTICLE}).encode()
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    path = f"/ask_question/{thread_id}"
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"test")],
+        "client": ("test", 1234),
+        "server": ("test", 80),
+    }
+    request = asyncio.create_task(backend.app(scope, receive, send))
+    await asyncio.sleep(disconnect_after)
+    disconnected.set()
+    await request
+    return messages[0]["status"]
+
+
+@pytest.fixture(autouse=True)
+def fast_disconnect_polling(monkeypatch):
+    monkeypatch.setattr(backend, "DISCONNECT_POLL_SECONDS", 0.01)
+
+
+async def start_thread(api):
+    response = await api.post("/start_thread")
+    return response.json()["thread_id"]
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_run_and_thread_stays_resumable(
+    api, fake_llm, human_workflow, session_factory
+):
+    """
+    Test that a disconnect stops the workflow and a retry completes the thread.
+    """
+    fake_llm.latency = 0.2
+    thread_id = await start_thread(api)
+
+    assert await ask_and_disconnect(thread_id, disconnect_after=0.05) == 499
+    assert fake_llm.calls == 0
+    assert backend.active_runs == {}
+    with session_factory() as db:
+        thread = db.get(backend.Thread, thread_id)
+        assert thread.question_asked is False
+    snapshot = await human_workflow.workflow.aget_state(
+        {"configurable": {"thread_id": thread_id}}
+    )
+    assert snapshot.next == ("newsagent_node",)
+
+    fake_llm.latency = 0
+    response = await api.post(f"/ask_question/{thread_id}", json={"question": ARTICLE})
+    assert response.status_code == 200
+    assert response.json()["answer"]
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_run(api, fake_llm, monkeypatch):
+    """
+    Test that a run exceeding the request deadline is cancelled with a 504.
+    """
+    fake_llm.latency = 0.2
+    monkeypatch.setattr(backend, "REQUEST_DEADLINE_SECONDS", 0.05)
+    thread_id = await start_thread(api)
+
+    response = await api.post(f"/ask_question/{thread_id}", json={"question": ARTICLE})
+
+    assert response.status_code == 504
+    calls = fake_llm.calls
+    await asyncio.sleep(0.3)
+    assert fake_llm.calls == calls
+    assert backend.active_runs == {}
+
+
+@pytest.mark.asyncio
+async def test_second_run_on_same_thread_is_rejected(api, fake_llm):
+    """
+    Test that a retry can't start a parallel run on the same thread.
+    """
+    fake_llm.latency = 0.05
+    thread_id = await start_thread(api)
+
+    first, second = await asyncio.gather(
+        api.post(f"/ask_question/{thread_id}", json={"question": ARTICLE}),
+        api.post(f"/ask_question/{thread_id}", json={"question": ARTICLE}),
+    )
+
+    assert sorted([first.status_code, second.status_code]) == [200, 409]
+
+
+@pytest.mark.asyncio
+async def test_mass_disconnect_releases_resources(
+    api, fake_llm, human_workflow, session_factory
+):
+    """
+    Test that abandoning many requests at once frees every slot they held.
+    """
+    fake_llm.latency = 60
+    thread_ids = [await start_thread(api) for _ in range(20)]
+
+    statuses = await asyncio.gather(
+        *(
+            ask_and_disconnect(thread_id, disconnect_after=0.1)
+            for thread_id in thread_ids
+        )
+    )
+
+    assert statuses == [499] * 20
+    assert fake_llm.calls == 0
+    assert default_scheduler.active == 0
+    assert human_workflow.app.single_flight.in_flight() == 0
+    assert backend.active_runs == {}
+    assert session_factory.kw["bind"].pool.checkedout() == 0
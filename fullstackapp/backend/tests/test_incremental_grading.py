@@ -0,0 +1,53 @@
+import pytest
+from workflows.news_workflow import GRADED_FIELDS, NewsWorkflow
+
+ARTICLE = "Lionel Messi is in talks about a transfer this summer."
+
+
+@pytest.mark.asyncio
+async def test_grader_only_reevaluates_unsettled_fields(fake_llm):
+    """
+    Test that fields already graded 'yes' are not sent to the grader again.
+    """
+    news_workflow = NewsWorkflow(llm=fake_llm)
+    state = {
+        "article": ARTICLE,
+        "off_or_ontopic": "yes",
+        "mentions_current_club": "yes",
+        "mentions_market_value": "no",
+        "meets_100_words": "no",
+    }
+
+    assert news_workflow._unsettled_fields(state) == (
+        "mentions_market_value",
+        "meets_100_words",
+    )
+    state = await news_workflow.update_article_state(state)
+
+    assert state["off_or_ontopic"] == "yes"
+    assert state["mentions_current_club"] == "yes"
+    assert set(news_workflow._postability_graders) == {
+        ("mentions_market_value", "meets_100_words")
+    }
+
+
+@pytest.mark.asyncio
+async def test_incremental_grading_uses_fewer_tokens(fake_llm):
+    """
+    Test that incremental grading reaches the same article with fewer tokens.
+    """
+    full_workflow = NewsWorkflow(llm=fake_llm, incremental_grading=False)
+    full_result = await full_workflow.ainvoke({"article": ARTICLE})
+    full_tokens = fake_llm.prompt_tokens + fake_llm.completion_tokens
+    full_calls = fake_llm.calls
+
+    fake_llm.reset_usage()
+    incremental_workflow = NewsWorkflow(llm=fake_llm)
+    incremental_result = await incremental_workflow.ainvoke({"article": ARTICLE})
+    incremental_tokens = fake_llm.prompt_tokens + fake_llm.completion_tokens
+
+    assert incremental_result == full_result
+    assert fake_llm.calls == full_calls
+    assert incremental_tokens < full_tokens
+    assert GRADED_FIELDS in incremental_workflow._postability_graders
+    assert len(incremental_workflow._postability_graders) > 1
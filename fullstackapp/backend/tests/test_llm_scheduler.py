@@ -0,0 +1,220 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from devtools.fake_llm import RateLimitedFakeChatModel
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+from openai import APIConnectionError, APITimeoutError
+from workflows.llm_scheduler import (
+    LLMScheduler,
+    Priority,
+    TokenBucket,
+    default_scheduler,
+    llm_priority,
+    scheduled,
+)
+from workflows.news_workflow import NewsWorkflow
+from workflows.player_memory import CorrectionFacts
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_over_time():
+    """
+    Test that the bucket reports how long until enough tokens are refilled.
+    """
+    clock = FakeClock()
+    bucket = TokenBucket(rate_per_minute=60, clock=clock)
+    bucket.take(60)
+
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    clock.now = 2.0
+    assert bucket.wait_time(2) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_interactive_calls_overtake_batch_calls():
+    """
+    Test that queued interactive calls are started before queued batch calls.
+    """
+    scheduler = LLMScheduler(max_concurrency=1)
+    release = asyncio.Event()
+    order = []
+
+    async def blocking_call():
+        await release.wait()
+
+    async def call(name):
+        order.append(name)
+
+    first = asyncio.create_task(scheduler.run(blocking_call))
+    await asyncio.sleep(0)
+    batch = asyncio.create_task(
+        scheduler.run(lambda: call("batch"), priority=Priority.BATCH)
+    )
+    with llm_priority(Priority.INTERACTIVE):
+        interactive = asyncio.create_task(scheduler.run(lambda: call("interactive")))
+    await asyncio.sleep(0)
+
+    assert scheduler.metrics()["queue_depth"] == {"interactive": 1, "batch": 1}
+    release.set()
+    await asyncio.gather(first, batch, interactive)
+
+    assert order == ["interactive", "batch"]
+    assert scheduler.metrics()["queue_depth"] == {"interactive": 0, "batch": 0}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    """
+    Test that a cancelled call neither holds a slot nor counts as queued.
+    """
+    scheduler = LLMScheduler(max_concurrency=1)
+    release = asyncio.Event()
+
+    async def blocking_call():
+        await release.wait()
+
+    first = asyncio.create_task(scheduler.run(blocking_call))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(scheduler.run(blocking_call))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    await asyncio.sleep(0)
+
+    assert scheduler.metrics()["queue_depth"]["interactive"] == 0
+    release.set()
+    await first
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_adapts_to_provider_rate_limits():
+    """
+    Test that 429s shrink concurrency and every call still completes.
+    """
+    provider = RateLimitedFakeChatModel(
+        latency=0.01, requests_per_window=20, window=0.2, max_concurrency=4
+    )
+    scheduler = LLMScheduler(max_concurrency=16, backoff=0.05)
+    model = scheduled(provider, scheduler)
+
+    results = await asyncio.gather(
+        *(model.ainvoke([HumanMessage(content=f"Article {i}")]) for i in range(40))
+    )
+
+    assert len(results) == 40
+    assert provider.rejected > 0
+    assert scheduler.rate_limited == provider.rejected
+    assert scheduler.concurrency_limit < 16
+    assert provider.peak_in_flight <= 4
+
+
+@pytest.mark.asyncio
+async def test_well_sized_scheduler_avoids_rate_limits():
+    """
+    Test that limits matching the provider never trigger a 429.
+    """
+    provider = RateLimitedFakeChatModel(
+        latency=0.01, requests_per_window=100, window=1.0, max_concurrency=4
+    )
+    scheduler = LLMScheduler(requests_per_minute=6000, max_concurrency=4)
+    model = scheduled(provider, scheduler)
+
+    await asyncio.gather(
+        *(model.ainvoke([HumanMessage(content=f"Article {i}")]) for i in range(40))
+    )
+
+    assert provider.rejected == 0
+    assert scheduler.metrics()["completed"] == 40
+
+
+@pytest.mark.asyncio
+async def test_workflow_calls_go_through_default_scheduler(fake_llm):
+    """
+    Test that every model call of the news workflow is admitted by the scheduler.
+    """
+    completed = default_scheduler.completed
+    news_workflow = NewsWorkflow(llm=fake_llm)
+
+    await news_workflow.ainvoke({"article": "Lionel Messi transfer news."})
+
+    assert default_scheduler.completed - completed == fake_llm.calls
+
+
+@pytest.mark.asyncio
+async def test_connection_errors_are_retried():
+    """
+    Test that connection errors and timeouts without a status code are retried.
+    """
+    scheduler = LLMScheduler(backoff=0)
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    errors = [APIConnectionError(request=request), APITimeoutError(request=request)]
+
+    async def flaky_call():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert await scheduler.run(flaky_call) == "ok"
+    assert scheduler.completed == 1
+
+
+@pytest.mark.asyncio
+async def test_structured_output_keeps_the_wrapped_models_method():
+    """
+    Test that a scheduled ChatOpenAI still requests strict JSON-schema output.
+    """
+    payloads = []
+
+    def handler(request):
+        payloads.append(json.loads(request.content))
+        return httpx.Response(
+            200,
+            json={
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-4o-mini",
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {
+                            "role": "assistant",
+                            "content": json.dumps({"players": []}),
+                        },
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 10,
+                    "completion_tokens": 5,
+                    "total_tokens": 15,
+                },
+            },
+        )
+
+    scheduler = LLMScheduler()
+    model = ChatOpenAI(
+        model="gpt-4o-mini",
+        api_key="sk-test",
+        max_retries=0,
+        http_async_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    extractor = scheduled(model, scheduler).with_structured_output(CorrectionFacts)
+
+    result = await extractor.ainvoke("Lionel Messi plays for Inter Miami.")
+
+    assert result == CorrectionFacts(players=[])
+    assert payloads[0]["response_format"]["type"] == "json_schema"
+    assert payloads[0]["response_format"]["json_schema"]["strict"] is True
+    assert "tools" not in payloads[0]
+    assert scheduler.completed == 1
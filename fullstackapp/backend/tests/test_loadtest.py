@@ -0,0 +1,48 @@
+import httpx
+import pytest
+from devtools.loadtest import run_load_test
+from workflows.llm_scheduler import default_scheduler
+
+
+@pytest.mark.asyncio
+async def test_load_test_runs_full_lifecycle():
+    """
+    Test that every simulated editor completes the lifecycle against app.py.
+    """
+    limits = (default_scheduler.requests, default_scheduler.max_concurrency)
+
+    report = await run_load_test(
+        threads=5, arrival_rate=100, llm_latency=0, query_latency=0
+    )
+    summary = report.summary()
+
+    assert summary["lifecycles"] == 5
+    for stats in summary["endpoints"].values():
+        assert stats["requests"] == 5
+        assert stats["error_rate"] == 0
+        assert sum(stats["histogram"].values()) == 5
+    assert 0 < summary["pool"]["peak_in_use"] <= summary["pool"]["max_size"]
+    assert summary["db_pool"]["max_size"] == 15
+    assert (default_scheduler.requests, default_scheduler.max_concurrency) == limits
+
+
+@pytest.mark.asyncio
+async def test_load_test_counts_raised_requests_as_errors(monkeypatch):
+    """
+    Test that a request failing with an exception shows up in the error rate.
+    """
+
+    async def broken_patch(self, url, **kwargs):
+        raise httpx.ReadError("connection reset", request=httpx.Request("PATCH", url))
+
+    monkeypatch.setattr(httpx.AsyncClient, "patch", broken_patch)
+
+    report = await run_load_test(
+        threads=3, arrival_rate=100, llm_latency=0, query_latency=0
+    )
+    summary = report.summary()
+
+    assert summary["lifecycles"] == 0
+    assert summary["endpoints"]["edit_state"]["requests"] == 3
+    assert summary["endpoints"]["edit_state"]["error_rate"] == 1
+    assert summary["endpoints"]["confirm"]["requests"] == 0
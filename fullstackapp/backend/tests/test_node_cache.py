@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+import pytest
+from workflows.news_workflow import NewsWorkflow
+from workflows.node_cache import NodeCache
+
+ARTICLE = "Lionel Messi is in talks about a transfer this summer."
+NAMESPACE = ("__pregel_ns_writes", "module.node", "news_chef")
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """
+    Test that the in-memory backend stays within max_entries.
+    """
+    cache = NodeCache.in_memory(max_entries=2)
+    cache.set({(NAMESPACE, "a"): ("A", None), (NAMESPACE, "b"): ("B", None)})
+    cache.get([(NAMESPACE, "a")])
+    cache.set({(NAMESPACE, "c"): ("C", None)})
+
+    assert cache.get([(NAMESPACE, "a"), (NAMESPACE, "b"), (NAMESPACE, "c")]) == {
+        (NAMESPACE, "a"): "A",
+        (NAMESPACE, "c"): "C",
+    }
+    assert cache.metrics()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    """
+    Test that an entry is a miss once its TTL has passed.
+    """
+    cache = NodeCache.in_memory()
+    cache.set({(NAMESPACE, "a"): ("A", 60)})
+
+    with patch("workflows.node_cache._now", return_value=10**12):
+        assert cache.get([(NAMESPACE, "a")]) == {}
+
+
+def test_sqlite_cache_is_bounded(tmp_path):
+    """
+    Test that the SQLite backend drops the oldest rows beyond max_entries.
+    """
+    cache = NodeCache.sqlite(str(tmp_path / "cache.sqlite"), max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set({(NAMESPACE, key): (key.upper(), None)})
+
+    assert cache.get([(NAMESPACE, "a"), (NAMESPACE, "c")]) == {(NAMESPACE, "c"): "C"}
+    assert cache.metrics()["entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_repeated_article_skips_grading(fake_llm):
+    """
+    Test that a second run of the same article reuses every graded step.
+    """
+    cache = NodeCache.in_memory()
+    news_workflow = NewsWorkflow(llm=fake_llm, cache=cache)
+
+    first = await news_workflow.ainvoke({"article": ARTICLE})
+    calls_first_run = fake_llm.calls
+    gradings = cache.metrics()["nodes"]["news_chef"]["misses"]
+    fake_llm.reset_usage()
+    second = await news_workflow.ainvoke({"article": ARTICLE})
+
+    assert second == first
+    assert fake_llm.calls == calls_first_run - gradings
+    assert cache.metrics()["nodes"]["news_chef"] == {
+        "hits": gradings,
+        "misses": gradings,
+        "hit_rate": 0.5,
+    }
+
+
+@pytest.mark.asyncio
+async def test_nodes_are_not_cached_without_a_cache(fake_llm):
+    """
+    Test that caching stays opt-in.
+    """
+    news_workflow = NewsWorkflow(llm=fake_llm)
+
+    await news_workflow.ainvoke({"article": ARTICLE})
+    calls_first_run = fake_llm.calls
+    await news_workflow.ainvoke({"article": ARTICLE})
+
+    assert fake_llm.calls == 2 * calls_first_run
@@ -0,0 +1,247 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import app as backend
+import pytest
+from workflows.llm_scheduler import Priority, current_priority
+from workflows.news_workflow import NewsWorkflow
+from workflows.player_memory import (
+    PLAYER_NAMESPACE,
+    PlayerFacts,
+    candidate_player_names,
+    changed_sentences,
+)
+
+
+def test_candidate_player_names():
+    """
+    Test that runs of capitalised words become normalized lookup keys.
+    """
+    candidates = candidate_player_names("Lionel Messi joined Inter Miami today.")
+
+    assert "lionel messi" in candidates
+    assert "inter miami" in candidates
+
+
+def test_candidate_player_names_include_single_words():
+    """
+    Test that one-word names such as "Neymar" are looked up as well.
+    """
+    assert "neymar" in candidate_player_names("Neymar could leave Santos.")
+
+
+@pytest.mark.asyncio
+async def test_recall_skips_articles_about_another_player(player_memory):
+    """
+    Test that a remembered player's fact is not used when another player is named.
+    """
+    await player_memory.aremember(
+        [
+            PlayerFacts(
+                player_name="Lionel Messi",
+                current_club="Inter Miami",
+                market_value="€35 million",
+            )
+        ]
+    )
+    article = (
+        "Inter Miami, home of Lionel Messi, want to sign Kevin De Bruyne this summer."
+    )
+
+    assert await player_memory.arecall_fact(article, "market_value") is None
+    recalled = await player_memory.arecall_fact(
+        "Lionel Messi could leave Inter Miami.", "market_value"
+    )
+    assert recalled == "Lionel Messi's market value is €35 million."
+
+
+@pytest.mark.asyncio
+async def test_recall_skips_articles_with_two_remembered_players(player_memory):
+    """
+    Test that nothing is recalled when two remembered players are mentioned.
+    """
+    await player_memory.aremember(
+        [
+            PlayerFacts(player_name="Lionel Messi", market_value="€35 million"),
+            PlayerFacts(player_name="Kevin De Bruyne", market_value="€25 million"),
+        ]
+    )
+
+    assert (
+        await player_memory.arecall_fact(
+            "Lionel Messi and Kevin De Bruyne could swap clubs.", "market_value"
+        )
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_recall_finds_one_word_names(player_memory):
+    """
+    Test that a player remembered under a single name is recalled.
+    """
+    await player_memory.aremember(
+        [PlayerFacts(player_name="Neymar", current_club="Santos")]
+    )
+
+    assert (
+        await player_memory.arecall_fact("Neymar could leave Santos.", "current_club")
+        == "Neymar currently plays for Santos."
+    )
+
+
+def test_changed_sentences():
+    """
+    Test that only added or rewritten sentences count as the editor's correction.
+    """
+    previous = "Lionel Messi plays for Inter Miami. He is 37 years old."
+    edited = "Lionel Messi plays for Inter Miami.  His market value is €35 million."
+
+    assert changed_sentences(previous, edited) == ["His market value is €35 million."]
+    assert changed_sentences(previous, previous) == []
+
+
+@pytest.mark.asyncio
+async def test_remember_merges_partial_facts(player_memory):
+    """
+    Test that a later correction only overrides the facts it states.
+    """
+    await player_memory.aremember(
+        [PlayerFacts(player_name="Lionel Messi", current_club="Inter Miami")]
+    )
+    await player_memory.aremember(
+        [PlayerFacts(player_name="lionel  messi", market_value="€35 million")]
+    )
+
+    facts = await player_memory.arecall("Lionel Messi scored twice.")
+
+    assert len(facts) == 1
+    assert facts[0]["current_club"] == "Inter Miami"
+    assert facts[0]["market_value"] == "€35 million"
+
+
+@pytest.mark.asyncio
+async def test_remember_uses_batched_writes(player_memory):
+    """
+    Test that many players are written with one batched read and one batched write.
+    """
+    facts = [
+        PlayerFacts(player_name=f"Player Number{i}", current_club="FC Test")
+        for i in range(10)
+    ]
+
+    with patch.object(
+        type(player_memory.store),
+        "abatch",
+        autospec=True,
+        side_effect=type(player_memory.store).abatch,
+    ) as mock_abatch:
+        await player_memory.aremember(facts)
+
+    assert mock_abatch.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_expired_facts_are_evicted(player_memory):
+    """
+    Test that facts older than the TTL are not recalled and are deleted.
+    """
+    await player_memory.aremember(
+        [PlayerFacts(player_name="Lionel Messi", market_value="€50 million")]
+    )
+    player_memory.ttl_minutes = 1
+
+    with patch("workflows.player_memory.time.time", return_value=10**12):
+        assert await player_memory.arecall("Lionel Messi") == []
+
+    assert await player_memory.store.aget(PLAYER_NAMESPACE, "lionel messi") is None
+
+
+@pytest.mark.asyncio
+async def test_researcher_uses_memory_before_agent(player_memory):
+    """
+    Test that a remembered fact is appended without invoking the researcher agent.
+    """
+    await player_memory.aremember(
+        [PlayerFacts(player_name="Lionel Messi", market_value="€35 million")]
+    )
+    news_workflow = NewsWorkflow(memory=player_memory)
+    news_workflow.market_value_agent = AsyncMock()
+
+    state = await news_workflow.market_value_researcher_node(
+        {"article": "Lionel Messi is rumoured to leave."}
+    )
+
+    assert state["facts"] == ["Lionel Messi's market value is €35 million."]
+    news_workflow.market_value_agent.ainvoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_researcher_falls_back_to_agent(player_memory):
+    """
+    Test that unknown players are still researched by the agent.
+    """
+    news_workflow = NewsWorkflow(memory=player_memory)
+    news_workflow.current_club_agent = AsyncMock()
+    news_workflow.current_club_agent.ainvoke.return_value = {
+        "agent_output": "He plays for Al Nassr FC."
+    }
+
+    state = await news_workflow.current_club_researcher_node(
+        {"article": "Cristiano Ronaldo is rumoured to leave."}
+    )
+
+    assert state["facts"] == ["He plays for Al Nassr FC."]
+    news_workflow.current_club_agent.ainvoke.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_edit_state_extracts_facts_from_the_correction_only(api, human_workflow):
+    """
+    Test that edit_state extracts facts from the changed sentences in the background.
+    """
+    thread_id = (await api.post("/start_thread")).json()["thread_id"]
+    answer = (
+        await api.post(
+            f"/ask_question/{thread_id}",
+            json={"question": "Lionel Messi is in talks about a transfer this summer."},
+        )
+    ).json()["answer"]
+    correction = "Lionel Messi's market value is €35 million."
+    human_workflow.memory.aextract_facts = AsyncMock(return_value=[])
+
+    response = await api.patch(
+        f"/edit_state/{thread_id}", json={"answer": f"{answer} {correction}"}
+    )
+    await asyncio.gather(*backend.background_tasks)
+
+    assert response.status_code == 200
+    human_workflow.memory.aextract_facts.assert_awaited_once_with(
+        correction, article=f"{answer} {correction}"
+    )
+
+
+@pytest.mark.asyncio
+async def test_edit_state_extracts_facts_at_batch_priority(api, human_workflow):
+    """
+    Test that the background fact extraction doesn't compete with interactive calls.
+    """
+    thread_id = (await api.post("/start_thread")).json()["thread_id"]
+    answer = (
+        await api.post(
+            f"/ask_question/{thread_id}",
+            json={"question": "Lionel Messi is in talks about a transfer this summer."},
+        )
+    ).json()["answer"]
+    priorities = []
+
+    async def extract_facts(*args, **kwargs):
+        priorities.append(current_priority())
+        return []
+
+    human_workflow.memory.aextract_facts = extract_facts
+
+    await api.patch(f"/edit_state/{thread_id}", json={"answer": f"{answer} Edited."})
+    await asyncio.gather(*backend.background_tasks)
+
+    assert priorities == [Priority.BATCH]
@@ -0,0 +1,126 @@
+import asyncio
+import json
+from pathlib import Path
+
+import app as backend
+import pytest
+from devtools import replay
+from workflows.player_memory import PlayerFacts
+
+FIXTURE = Path(__file__).parent / "fixtures" / "replay_thread.json"
+ARTICLE = (
+    "Lionel Messi is in talks about a transfer this summer. "
+    "The Argentine forward could leave his club before the new season."
+)
+
+
+@pytest.mark.asyncio
+async def test_recorded_thread_replays_offline(api, human_workflow):
+    """
+    Test that a thread recorded through the API replays to the same final state.
+    """
+    human_workflow.record_llm_calls = True
+    await human_workflow.memory.aremember(
+        [PlayerFacts(player_name="Lionel Messi", current_club="Inter Miami")]
+    )
+    thread_id = (await api.post("/start_thread")).json()["thread_id"]
+    answer = (
+        await api.post(f"/ask_question/{thread_id}", json={"question": ARTICLE})
+    ).json()["answer"]
+    await api.patch(f"/edit_state/{thread_id}", json={"answer": f"{answer} Edited."})
+    await api.post(f"/confirm/{thread_id}")
+
+    fixture = await replay.export_thread(
+        human_workflow.checkpointer, human_workflow.memory.store, thread_id
+    )
+    report = await replay.replay_fixture(fixture, repeat=2)
+
+    assert fixture["llm_calls"]
+    assert fixture["checkpoints"][-1]["values"]["answer"] == f"{answer} Edited."
+    assert report.matches, report.mismatches
+    assert report.summary()["llm_calls_per_run"] == len(fixture["llm_calls"])
+    assert report.prompt_mismatches == 0
+    assert "news_chef" in report.summary()["nodes"]
+
+
+@pytest.mark.asyncio
+async def test_committed_fixture_replays():
+    """
+    Test that the committed fixture still replays against the current code.
+    """
+    report = await replay.replay_fixture(replay.load_fixture(FIXTURE))
+
+    assert report.matches, report.mismatches
+    assert report.prompt_mismatches == 0
+
+
+def test_cli_fails_on_a_changed_result(tmp_path, capsys):
+    """
+    Test that the run command exits non-zero when the replayed state differs.
+    """
+    fixture = replay.load_fixture(FIXTURE)
+    fixture["checkpoints"][-1]["values"]["answer"] = "A different article."
+    path = tmp_path / "changed.json"
+    path.write_text(json.dumps(fixture))
+
+    assert replay.main(["run", str(path)]) == 1
+    assert "mismatch: answer" in capsys.readouterr().out
+
+
+def test_cli_enforces_the_time_budget(capsys):
+    """
+    Test that the run command exits non-zero when replays exceed --max-mean-run-ms.
+    """
+    assert replay.main(["run", str(FIXTURE), "--max-mean-run-ms", "0"]) == 1
+    assert "exceeds" in capsys.readouterr().out
+
+
+def test_recording_is_off_by_default():
+    """
+    Test that the app only records model calls when asked to.
+    """
+    assert backend.human_workflow.record_llm_calls is False
+
+
+@pytest.mark.asyncio
+async def test_export_fails_without_a_recording(human_workflow):
+    """
+    Test that a thread answered with recording off can't be exported.
+    """
+    config = {"configurable": {"thread_id": "unrecorded"}}
+    await human_workflow.ainvoke({"question": ARTICLE}, config)
+
+    with pytest.raises(replay.ExportError, match="no recorded model calls"):
+        await replay.export_thread(
+            human_workflow.checkpointer, human_workflow.memory.store, "unrecorded"
+        )
+
+
+@pytest.mark.asyncio
+async def test_export_fails_for_a_coalesced_thread(human_workflow, fake_llm):
+    """
+    Test that only the thread that started a coalesced run can be exported.
+    """
+    human_workflow.record_llm_calls = True
+    fake_llm.latency = 0.01
+    thread_ids = ["leader", "follower"]
+    await asyncio.gather(
+        *(
+            human_workflow.ainvoke(
+                {"question": ARTICLE}, {"configurable": {"thread_id": thread_id}}
+            )
+            for thread_id in thread_ids
+        )
+    )
+
+    exported, failed = [], []
+    for thread_id in thread_ids:
+        try:
+            await replay.export_thread(
+                human_workflow.checkpointer, human_workflow.memory.store, thread_id
+            )
+            exported.append(thread_id)
+        except replay.ExportError:
+            failed.append(thread_id)
+
+    assert len(exported) == len(failed) == 1
@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+from langchain_core.callbacks import BaseCallbackHandler
+from langgraph.checkpoint.memory import InMemorySaver
+from workflows.human_workflow import HumanWorkflow
+from workflows.news_workflow import NewsWorkflow
+from workflows.single_flight import SingleFlight
+
+ARTICLE = "Lionel Messi is in talks about a transfer this summer."
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_share_one_run(fake_llm):
+    """
+    Test that identical in-flight articles run the workflow only once.
+    """
+    fake_llm.latency = 0.01
+    single_run = NewsWorkflow(llm=fake_llm)
+    await single_run.ainvoke({"article": ARTICLE})
+    calls_per_run = fake_llm.calls
+
+    fake_llm.reset_usage()
+    single_flight = SingleFlight()
+    news_workflow = NewsWorkflow(llm=fake_llm, single_flight=single_flight)
+    results = await asyncio.gather(
+        news_workflow.ainvoke({"article": ARTICLE}),
+        news_workflow.ainvoke({"article": f"  {ARTICLE}\n"}),
+        news_workflow.ainvoke({"article": ARTICLE}),
+    )
+
+    assert fake_llm.calls == calls_per_run
+    assert single_flight.executions == 1
+    assert single_flight.coalesced == 2
+    assert results[0] == results[1] == results[2]
+    assert results[0] is not results[1]
+    assert single_flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_custom_normalization_controls_coalescing():
+    """
+    Test that the key normalization decides which articles are duplicates.
+    """
+    single_flight = SingleFlight(normalize=str.casefold)
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(single_flight.do(single_flight.key("ABC"), work))
+    second = asyncio.create_task(single_flight.do(single_flight.key("abc"), work))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(first, second) == ["done", "done"]
+    assert single_flight.executions == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_run():
+    """
+    Test that the shared run survives until its last waiter is cancelled.
+    """
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def work():
+        started.set()
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(single_flight.do("key", work))
+    second = asyncio.create_task(single_flight.do("key", work))
+    await started.wait()
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_last_waiter_cancels_shared_run():
+    """
+    Test that the shared run is cancelled once nobody awaits it anymore.
+    """
+    single_flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def work():
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(single_flight.do("key", work))
+    await started.wait()
+    waiter.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert single_flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_each_thread_keeps_its_own_checkpoint(fake_llm):
+    """
+    Test that coalesced threads still write separate checkpoints.
+    """
+    fake_llm.latency = 0.01
+    human_workflow = HumanWorkflow(llm=fake_llm)
+    human_workflow.set_checkpointer(InMemorySaver())
+
+    responses = await asyncio.gather(
+        *(
+            human_workflow.ainvoke(
+                input={"question": ARTICLE},
+                config={"configurable": {"thread_id": thread_id}},
+            )
+            for thread_id in ("thread-1", "thread-2")
+        )
+    )
+
+    assert human_workflow.app.single_flight.executions == 1
+    for thread_id, response in zip(("thread-1", "thread-2"), responses):
+        snapshot = await human_workflow.workflow.aget_state(
+            {"configurable": {"thread_id": thread_id}}
+        )
+        assert snapshot.values["answer"] == response["answer"]
+        assert snapshot.next == ("confirm_node",)
+
+
+@pytest.mark.asyncio
+async def test_shared_run_inherits_recursion_limit_and_callbacks(fake_llm):
+    """
+    Test that the caller's recursion limit and callbacks reach the shared run.
+    """
+
+    class NodeRecorder(BaseCallbackHandler):
+        def __init__(self):
+            self.nodes = []
+
+        def on_chain_start(self, serialized, inputs, **kwargs):
+            self.nodes.append(kwargs.get("name"))
+
+    human_workflow = HumanWorkflow(llm=fake_llm)
+    human_workflow.set_checkpointer(InMemorySaver())
+    recorder = NodeRecorder()
+
+    traced = await human_workflow.ainvoke(
+        input={"question": ARTICLE},
+        config={"callbacks": [recorder], "configurable": {"thread_id": "traced"}},
+    )
+    limited = await human_workflow.ainvoke(
+        input={"question": ARTICLE},
+        config={"recursion_limit": 3, "configurable": {"thread_id": "limited"}},
+    )
+
+    assert traced["error"] is False
+    assert "news_chef" in recorder.nodes
+    assert limited["error"] is True
+    assert human_workflow.app.single_flight.executions == 2
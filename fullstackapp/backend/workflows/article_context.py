@@ -0,0 +1,108 @@
+import re
+from typing import Callable, List, Optional
+
+from langchain_core.messages import BaseMessage
+
+from .player_memory import SENTENCE_BOUNDARY
+
+NON_WORD = re.compile(r"\W+")
+
+# Upper bound on the article context each model is sent, in estimated tokens.
+CONTEXT_TOKEN_LIMITS = {
+    "news_chef": 3000,
+    "market_value": 1500,
+    "current_club": 1500,
+    "text_writer": 3000,
+}
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Four characters per token, the estimate the LLM scheduler budgets with."""
+    return -(-len(text) // 4)
+
+
+def _normalize(text: str) -> str:
+    return NON_WORD.sub(" ", text.lower()).strip()
+
+
+def dedupe_facts(text: str, facts: List[str]) -> List[str]:
+    """Drop empty snippets and those already stated in ``text`` or an earlier fact."""
+    seen = f" {_normalize(text)} "
+    unique = []
+    for fact in facts:
+        normalized = _normalize(fact)
+        if not normalized or f" {normalized} " in seen:
+            continue
+        unique.append(fact.strip())
+        seen += f"{normalized} "
+    return unique
+
+
+def truncate_to_tokens(
+    text: str,
+    max_tokens: Optional[int],
+    count_tokens: Callable[[str], int] = estimate_text_tokens,
+) -> str:
+    """Keep the leading sentences of ``text`` that fit into ``max_tokens``.
+
+    A first sentence that is longer than the budget is cut between words.
+    """
+    if max_tokens is None or count_tokens(text) <= max_tokens:
+        return text
+    kept = []
+    for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+        if count_tokens(" ".join([*kept, sentence])) > max_tokens:
+            break
+        kept.append(sentence)
+    if kept:
+        return " ".join(kept)
+    words = []
+    for word in text.split():
+        if count_tokens(" ".join([*words, word])) > max_tokens:
+            break
+        words.append(word)
+    return " ".join(words)
+
+
+def compact_article(
+    article: str,
+    facts: List[str],
+    max_tokens: Optional[int] = None,
+    count_tokens: Callable[[str], int] = estimate_text_tokens,
+) -> str:
+    """Build the context for a model from the article and the researched facts.
+
+    Facts the article already states are left out. When the result exceeds
+    ``max_tokens`` the article is shortened first, since the facts are what
+    the researchers were asked to add.
+    """
+    facts_text = " ".join(dedupe_facts(article, facts))
+    context = f"{article} {facts_text}".strip()
+    if max_tokens is None or count_tokens(context) <= max_tokens:
+        return context
+    article_budget = max_tokens - count_tokens(facts_text) - 1
+    if article_budget <= 0:
+        return truncate_to_tokens(facts_text, max_tokens, count_tokens)
+    article = truncate_to_tokens(article, article_budget, count_tokens)
+    return f"{article} {facts_text}".strip()
+
+
+def cap_message_history(
+    messages: List[BaseMessage],
+    max_tokens: Optional[int],
+    count_tokens: Callable[[str], int] = estimate_text_tokens,
+) -> List[BaseMessage]:
+    """Shorten the leading article message so a tool loop stays within ``max_tokens``.
+
+    Tool calls and their results are kept as they are; the article keeps at
+    least a quarter of the budget.
+    """
+    if max_tokens is None or not messages:
+        return messages
+    article, *history = messages
+    history_tokens = sum(count_tokens(str(message.content)) for message in history)
+    budget = max(max_tokens - history_tokens, max_tokens // 4)
+    content = truncate_to_tokens(article.content, budget, count_tokens)
+    if content == article.content:
+        return messages
+    return [article.model_copy(update={"content": content}), *history]
@@ -2,12 +2,16 @@ from operator import add
 from typing import Annotated, List, Literal, TypedDict
 
 from dotenv import load_dotenv
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, START, StateGraph
 from langgraph.prebuilt import ToolNode
 
+from .article_context import cap_message_history
+from .llm_scheduler import scheduled
+
 # Load environment variables
 load_dotenv()
 
@@ -34,9 +38,13 @@ def get_current_club(player_name: str):
     return fake_db.get(player_name, "Current club information not available.")
 
 
-def create_current_club_agent():
+def create_current_club_agent(
+    llm: BaseChatModel = None, max_context_tokens: int = None
+):
     tools_current_club = [get_current_club]
-    model_current_club = ChatOpenAI(model="gpt-4o-mini").bind_tools(tools_current_club)
+    model_current_club = scheduled(
+        llm or ChatOpenAI(model="gpt-4o-mini", max_retries=0)
+    ).bind_tools(tools_current_club)
 
     async def call_model_current_club(state: OverallState):
         local_messages = state.get("messages", [])
@@ -49,7 +57,10 @@ def create_current_club_agent():
 If the current club is mentioned, return it. Otherwise, return 'Current club information not available.'"""
         )
 
-        response = await model_current_club.ainvoke([system_message] + local_messages)
+        # Every tool loop resends the history, so the article in it is capped.
+        response = await model_current_club.ainvoke(
+            [system_message] + cap_message_history(local_messages, max_context_tokens)
+        )
 
         state["agent_output"] = response.content
         state["messages"] = local_messages + [response]
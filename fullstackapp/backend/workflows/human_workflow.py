@@ -1,8 +1,13 @@
 from typing import TypedDict
 
+from langchain_core.language_models import BaseChatModel
+from langgraph.cache.base import BaseCache
 from langgraph.graph import END, StateGraph
 
+from .llm_recorder import LLM_RECORDINGS_NAMESPACE, LLMRecorder
 from .news_workflow import NewsWorkflow
+from .player_memory import PlayerMemory, changed_sentences
+from .single_flight import SingleFlight
 
 
 class InputState(TypedDict):
@@ -19,8 +24,17 @@ class FinalState(IntermediateState):
 
 
 class HumanWorkflow:
-    def __init__(self):
-        self.app = NewsWorkflow()
+    def __init__(
+        self,
+        llm: BaseChatModel = None,
+        cache: BaseCache = None,
+        record_llm_calls: bool = False,
+    ):
+        self.memory = PlayerMemory(llm=llm)
+        self.record_llm_calls = record_llm_calls
+        self.app = NewsWorkflow(
+            memory=self.memory, llm=llm, single_flight=SingleFlight(), cache=cache
+        )
         self.checkpointer = None
         self.workflow = None
 
@@ -28,6 +42,9 @@ class HumanWorkflow:
         self.checkpointer = checkpointer
         self.workflow = self._create_workflow()
 
+    def set_store(self, store):
+        self.memory.set_store(store)
+
     def _create_workflow(self):
         workflow = StateGraph(FinalState, input=InputState, output=FinalState)
         workflow.add_node("newsagent_node", self.newsagent_node)
@@ -58,7 +75,38 @@ class HumanWorkflow:
         state["confirmed"] = "true"
         return state
 
-    async def ainvoke(self, *args, **kwargs):
+    async def remember_correction(self, previous_answer: str, answer: str):
+        """Remember the player facts the editor added or changed in ``answer``."""
+        corrections = changed_sentences(previous_answer, answer)
+        if not corrections:
+            return
+        facts = await self.memory.aextract_facts(" ".join(corrections), article=answer)
+        await self.memory.aremember(facts)
+
+    async def _save_llm_calls(self, thread_id: str, calls: list):
+        store = self.memory.store
+        recorded = await store.aget(LLM_RECORDINGS_NAMESPACE, thread_id)
+        previous = recorded.value["calls"] if recorded else []
+        await store.aput(
+            LLM_RECORDINGS_NAMESPACE,
+            thread_id,
+            {"calls": previous + calls},
+            index=False,
+        )
+
+    async def ainvoke(self, input, config=None, **kwargs):
         if not self.workflow:
             raise RuntimeError("HumanWorkflow has no checkpointer set.")
-        return await self.workflow.ainvoke(*args, **kwargs)
+        if not self.record_llm_calls:
+            return await self.workflow.ainvoke(input, config, **kwargs)
+        # Keep the model responses next to the checkpoints so the run can be
+        # replayed offline with devtools.replay.
+        recorder = LLMRecorder()
+        config = dict(config or {})
+        config["callbacks"] = [*(config.get("callbacks") or []), recorder]
+        response = await self.workflow.ainvoke(input, config, **kwargs)
+        if recorder.calls:
+            await self._save_llm_calls(
+                config["configurable"]["thread_id"], recorder.calls
+            )
+        return response
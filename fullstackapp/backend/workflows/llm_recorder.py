@@ -0,0 +1,41 @@
+import hashlib
+from typing import Dict, List
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage, message_to_dict
+
+LLM_RECORDINGS_NAMESPACE = ("news", "llm_recordings")
+
+
+def prompt_fingerprint(messages: List[BaseMessage]) -> str:
+    text = "\n".join(f"{message.type}: {message.content}" for message in messages)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+class LLMRecorder(BaseCallbackHandler):
+    """Records the response of every chat model call made during a run.
+
+    Prompts are only kept as a fingerprint, which is enough to tell whether
+    a replay sent the model the same prompt.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self.calls: List[dict] = []
+        self._prompts: Dict[UUID, str] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._prompts[run_id] = prompt_fingerprint(messages[0])
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self.calls.append(
+            {
+                "prompt": self._prompts.pop(run_id, None),
+                "response": message_to_dict(response.generations[0][0].message),
+            }
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._prompts.pop(run_id, None)
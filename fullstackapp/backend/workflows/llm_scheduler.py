@@ -0,0 +1,340 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_core.runnables import RunnableParallel, RunnableSequence
+from openai import APIConnectionError
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "llm_priority", default=Priority.INTERACTIVE
+)
+
+
+def current_priority() -> Priority:
+    return _priority.get()
+
+
+@contextmanager
+def llm_priority(priority: Priority):
+    """Run every model call made inside the block with ``priority``."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+async def run_with_priority(priority: Priority, awaitable: Awaitable[Any]) -> Any:
+    with llm_priority(priority):
+        return await awaitable
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429
+
+
+def is_transient_error(error: BaseException) -> bool:
+    # Connection errors and timeouts (openai.APITimeoutError included) have
+    # no status code but are worth retrying like a 5xx.
+    if isinstance(error, (APIConnectionError, ConnectionError, TimeoutError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return status is not None and status >= 500
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        retry_after = headers.get("retry-after")
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Refills ``rate_per_minute`` units per minute up to one minute of capacity."""
+
+    def __init__(self, rate_per_minute: float, clock: Callable[[], float]):
+        self.rate = rate_per_minute / 60
+        self.capacity = rate_per_minute
+        self.clock = clock
+        self.tokens = float(rate_per_minute)
+        self.updated_at = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, amount: float):
+        """Charge (positive) or refund (negative) the difference to an estimate."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class _Waiter:
+    def __init__(self, future: asyncio.Future, tokens: int):
+        self.future = future
+        self.tokens = tokens
+
+
+class LLMScheduler:
+    """Process-wide admission control for model calls.
+
+    Calls are queued by priority and only started when a request token, the
+    estimated prompt tokens and a concurrency slot are available. The
+    concurrency limit grows additively while calls succeed within
+    ``latency_target`` and is halved on every 429.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 500,
+        tokens_per_minute: float = 200_000,
+        max_concurrency: int = 16,
+        min_concurrency: int = 1,
+        latency_target: float = 20.0,
+        max_retries: int = 5,
+        backoff: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.clock = clock
+        self.requests = TokenBucket(requests_per_minute, clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.latency_target = latency_target
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.active = 0
+        self.completed = 0
+        self.rate_limited = 0
+        self._paused_until = 0.0
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @classmethod
+    def from_env(cls) -> "LLMScheduler":
+        return cls(
+            requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", 500)),
+            tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", 200_000)),
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 16)),
+        )
+
+    def configure(
+        self,
+        requests_per_minute: float = None,
+        tokens_per_minute: float = None,
+        max_concurrency: int = None,
+    ):
+        if requests_per_minute is not None:
+            self.requests = TokenBucket(requests_per_minute, self.clock)
+        if tokens_per_minute is not None:
+            self.tokens = TokenBucket(tokens_per_minute, self.clock)
+        if max_concurrency is not None:
+            self.max_concurrency = max_concurrency
+            self.concurrency_limit = float(max_concurrency)
+
+    def metrics(self) -> dict:
+        depth = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _, waiter in self._queue:
+            if not waiter.future.done():
+                depth[Priority(priority).name.lower()] += 1
+        return {
+            "queue_depth": depth,
+            "active": self.active,
+            "concurrency_limit": round(self.concurrency_limit, 2),
+            "completed": self.completed,
+            "rate_limited": self.rate_limited,
+        }
+
+    def _dispatch(self):
+        self._timer = None
+        loop = asyncio.get_running_loop()
+        while self._queue:
+            _, _, waiter = self._queue[0]
+            if waiter.future.done() or waiter.future.get_loop() is not loop:
+                heapq.heappop(self._queue)
+                continue
+            if self.active >= max(self.min_concurrency, int(self.concurrency_limit)):
+                return
+            wait = max(
+                self._paused_until - self.clock(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(waiter.tokens),
+            )
+            if wait > 0:
+                self._timer = loop.call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._queue)
+            self.requests.take(1)
+            self.tokens.take(waiter.tokens)
+            self.active += 1
+            waiter.future.set_result(None)
+
+    async def _acquire(self, priority: Priority, tokens: int):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(
+            self._queue, (int(priority), next(self._sequence), _Waiter(future, tokens))
+        )
+        if self._timer is None or self._timer.when() < loop.time() - 1:
+            # No wake-up is pending (or it belonged to a loop that is gone).
+            self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self):
+        self.active -= 1
+        if self._timer is None:
+            self._dispatch()
+
+    def _on_success(self, latency: float):
+        self.completed += 1
+        if latency > self.latency_target:
+            self.concurrency_limit = max(
+                self.min_concurrency, self.concurrency_limit * 0.9
+            )
+        else:
+            self.concurrency_limit = min(
+                self.max_concurrency,
+                self.concurrency_limit + 1 / max(self.concurrency_limit, 1),
+            )
+
+    def _on_rate_limited(self, error: BaseException, attempt: int) -> float:
+        self.rate_limited += 1
+        self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+        delay = retry_after_seconds(error) or self.backoff * 2**attempt
+        self._paused_until = max(self._paused_until, self.clock() + delay)
+        return delay
+
+    async def run(
+        self,
+        func: Callable[[], Awaitable[Any]],
+        estimated_tokens: int = 0,
+        priority: Optional[Priority] = None,
+        used_tokens: Callable[[Any], Optional[int]] = lambda result: None,
+    ) -> Any:
+        priority = current_priority() if priority is None else priority
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(priority, estimated_tokens)
+            started = self.clock()
+            try:
+                result = await func()
+            except Exception as error:
+                if attempt == self.max_retries:
+                    raise
+                if is_rate_limit_error(error):
+                    self._on_rate_limited(error, attempt)
+                elif is_transient_error(error):
+                    await asyncio.sleep(self.backoff * 2**attempt)
+                else:
+                    raise
+                continue
+            finally:
+                self._release()
+            self._on_success(self.clock() - started)
+            actual = used_tokens(result)
+            if actual is not None:
+                self.tokens.adjust(actual - estimated_tokens)
+            return result
+
+
+def estimate_tokens(messages: List[BaseMessage], completion_tokens: int = 256) -> int:
+    characters = sum(len(str(message.content)) for message in messages)
+    return characters // 4 + completion_tokens
+
+
+def _used_tokens(result: ChatResult) -> Optional[int]:
+    usage = getattr(result.generations[0].message, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+
+default_scheduler = LLMScheduler.from_env()
+
+
+class ScheduledChatModel(BaseChatModel):
+    """Chat model wrapper that sends every call through an ``LLMScheduler``."""
+
+    model: BaseChatModel
+    scheduler: Optional[LLMScheduler] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return f"scheduled-{self.model._llm_type}"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(**self.model.bind_tools(tools, **kwargs).kwargs)
+
+    def with_structured_output(self, schema, **kwargs):
+        # The wrapped model decides how structured output is requested (e.g.
+        # json_schema for ChatOpenAI). Only its model call is swapped for ours.
+        first, *parsers = self.model.with_structured_output(schema, **kwargs).steps
+        if isinstance(first, RunnableParallel):
+            first = RunnableParallel(raw=self.bind(**first.steps__["raw"].kwargs))
+        else:
+            first = self.bind(**first.kwargs)
+        return RunnableSequence(first, *parsers)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return self.model._generate(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        )
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        scheduler = self.scheduler or default_scheduler
+        return await scheduler.run(
+            lambda: self.model._agenerate(
+                messages, stop=stop, run_manager=run_manager, **kwargs
+            ),
+            estimated_tokens=estimate_tokens(messages),
+            used_tokens=_used_tokens,
+        )
+
+
+def scheduled(model: BaseChatModel, scheduler: LLMScheduler = None) -> BaseChatModel:
+    if isinstance(model, ScheduledChatModel):
+        return model
+    return ScheduledChatModel(model=model, scheduler=scheduler)
@@ -2,12 +2,16 @@ from operator import add
 from typing import Annotated, List, Literal, TypedDict
 
 from dotenv import load_dotenv
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_core.tools import tool
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, START, StateGraph
 from langgraph.prebuilt import ToolNode
 
+from .article_context import cap_message_history
+from .llm_scheduler import scheduled
+
 # Load environment variables
 load_dotenv()
 
@@ -36,9 +40,13 @@ def get_market_value(player_name: str):
     )
 
 
-def create_market_value_agent():
+def create_market_value_agent(
+    llm: BaseChatModel = None, max_context_tokens: int = None
+):
     tools_market_value = [get_market_value]
-    model_market_value = ChatOpenAI(model="gpt-4o-mini").bind_tools(tools_market_value)
+    model_market_value = scheduled(
+        llm or ChatOpenAI(model="gpt-4o-mini", max_retries=0)
+    ).bind_tools(tools_market_value)
 
     async def call_model_market_value(state: OverallState):
         local_messages = state.get("messages", [])
@@ -51,7 +59,10 @@ def create_market_value_agent():
 If the market value is mentioned, return it. Otherwise, return 'Market value information not available.'"""
         )
 
-        response = await model_market_value.ainvoke([system_message] + local_messages)
+        # Every tool loop resends the history, so the article in it is capped.
+        response = await model_market_value.ainvoke(
+            [system_message] + cap_message_history(local_messages, max_context_tokens)
+        )
 
         state["agent_output"] = response.content
         state["messages"] = local_messages + [response]
@@ -1,12 +1,21 @@
-from typing import Literal, TypedDict
+import json
+from typing import Dict, List, Literal, TypedDict
 
+from langchain_core.language_models import BaseChatModel
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import ensure_config
 from langchain_openai import ChatOpenAI
+from langgraph.cache.base import BaseCache
 from langgraph.graph import END, StateGraph
-from pydantic import BaseModel, Field
+from langgraph.types import CachePolicy
+from pydantic import BaseModel, Field, create_model
 
+from .article_context import CONTEXT_TOKEN_LIMITS, compact_article, dedupe_facts
 from .current_club import create_current_club_agent
+from .llm_scheduler import current_priority, run_with_priority, scheduled
 from .market_value import create_market_value_agent
+from .player_memory import PlayerMemory
+from .single_flight import SingleFlight
 from .text_writer import create_text_writer_agent
 
 
@@ -27,6 +36,43 @@ class ArticlePostabilityGrader(BaseModel):
     )
 
 
+GRADED_FIELDS = tuple(ArticlePostabilityGrader.model_fields)
+
+GRADING_CRITERIA = {
+    "off_or_ontopic": "The article is about football transfers or not. If yes answer, answer with 'yes', anotherwise with 'no'.",
+    "mentions_market_value": "The article explicitly mentions the player's market value, for example, by stating \"market value\" or a specific currency amount (e.g., \"$50 million\"). If this is present, respond with 'yes' for mentions_market_value; otherwise, respond 'no'.",
+    "mentions_current_club": "The article mentions the player's current club or indicates that the current club information is unavailable (e.g., \"Current club information not available\"). If this is present, respond with 'yes' for mentions_current_club; otherwise, respond 'no'.",
+    "meets_100_words": "The article contains at least 100 words. If this is met, respond with 'yes' for meets_100_words; otherwise, respond 'no'.",
+}
+
+GRADING_CACHE_TTL_SECONDS = 60 * 60 * 24
+
+GRADING_SCORES = {
+    "off_or_ontopic": "'yes' or 'no' depending on whether the article is related to football transfers or not.",
+    "mentions_market_value": "'yes' or 'no' depending on whether the article mentions the player's market value.",
+    "mentions_current_club": "'yes' or 'no' depending on whether the article mentions the player's current club or states that the information is unavailable.",
+    "meets_100_words": "'yes' or 'no' depending on whether the article has at least 100 words.",
+}
+
+
+def _grader_schema(fields):
+    """Structured-output schema restricted to the still unsettled ``fields``.
+
+    A 'yes' can't turn into a 'no' by appending text, so settled fields are
+    dropped from later grading rounds.
+    """
+    if fields == GRADED_FIELDS:
+        return ArticlePostabilityGrader
+    return create_model(
+        "ArticlePostabilityGrader",
+        __doc__=ArticlePostabilityGrader.__doc__,
+        **{
+            field: (str, ArticlePostabilityGrader.model_fields[field])
+            for field in fields
+        },
+    )
+
+
 class InputArticleState(TypedDict):
     article: str
 
@@ -37,70 +83,170 @@ class OutputFinalArticleState(TypedDict):
 
 
 class SharedArticleState(InputArticleState, OutputFinalArticleState):
+    facts: List[str]
     mentions_market_value: str
     mentions_current_club: str
     meets_100_words: str
 
 
 class NewsWorkflow:
-    def __init__(self, llm_model="gpt-4o-mini", temperature=0):
-        self.current_club_agent = create_current_club_agent()
-        self.market_value_agent = create_market_value_agent()
-        self.text_writer_agent = create_text_writer_agent()
-        self.llm_postability = ChatOpenAI(model=llm_model, temperature=temperature)
+    def __init__(
+        self,
+        llm_model="gpt-4o-mini",
+        temperature=0,
+        memory: PlayerMemory = None,
+        llm: BaseChatModel = None,
+        incremental_grading=True,
+        single_flight: SingleFlight = None,
+        cache: BaseCache = None,
+        compact_context=True,
+        context_token_limits: Dict[str, int] = None,
+    ):
+        self.compact_context = compact_context
+        self.context_token_limits = (
+            {**CONTEXT_TOKEN_LIMITS, **(context_token_limits or {})}
+            if compact_context
+            else {}
+        )
+        self.current_club_agent = create_current_club_agent(
+            llm, self.context_token_limits.get("current_club")
+        )
+        self.market_value_agent = create_market_value_agent(
+            llm, self.context_token_limits.get("market_value")
+        )
+        self.text_writer_agent = create_text_writer_agent(llm)
+        self.llm_postability = scheduled(
+            llm or ChatOpenAI(model=llm_model, temperature=temperature, max_retries=0)
+        )
+        self.memory = memory
+        self.incremental_grading = incremental_grading
+        self.single_flight = single_flight
+        self.model_config = (
+            getattr(llm, "model_name", type(llm).__name__) if llm else llm_model,
+            temperature,
+            incremental_grading,
+            tuple(sorted(self.context_token_limits.items())),
+        )
+        self._postability_graders = {}
+        self.cache = cache
+        # Nodes whose result may be reused across runs and threads once a
+        # cache is set. The grader is only deterministic at temperature 0.
+        self.cache_policies = {}
+        if temperature == 0:
+            self.cache_policies["news_chef"] = CachePolicy(
+                key_func=self._grading_cache_key, ttl=GRADING_CACHE_TTL_SECONDS
+            )
         self.workflow = self._create_workflow()
 
-    def _create_postability_grader(self):
-        prompt_template = """
+    def _create_postability_grader(self, fields=GRADED_FIELDS):
+        criteria = "\n".join(
+            f"        {number}. {GRADING_CRITERIA[field]}"
+            for number, field in enumerate(fields, start=1)
+        )
+        scores = "\n".join(
+            f"        - {field}: {GRADING_SCORES[field]}" for field in fields
+        )
+        prompt_template = f"""
         You are a grader assessing whether a news article meets the following criteria:
-        1. The article is about football transfers or not. If yes answer, answer with 'yes', anotherwise with 'no'.
-        1. The article explicitly mentions the player's market value, for example, by stating "market value" or a specific currency amount (e.g., "$50 million"). If this is present, respond with 'yes' for mentions_market_value; otherwise, respond 'no'.
-        2. The article mentions the player's current club or indicates that the current club information is unavailable (e.g., "Current club information not available"). If this is present, respond with 'yes' for mentions_current_club; otherwise, respond 'no'.
-        3. The article contains at least 100 words. If this is met, respond with 'yes' for meets_100_words; otherwise, respond 'no'.
-
-        Provide four binary scores ('yes' or 'no') as follows:
-        - off_or_ontopic: 'yes' or 'no' depending on whether the article is related to football transfers or not.
-        - mentions_market_value: 'yes' or 'no' depending on whether the article mentions the player's market value.
-        - mentions_current_club: 'yes' or 'no' depending on whether the article mentions the player's current club or states that the information is unavailable.
-        - meets_100_words: 'yes' or 'no' depending on whether the article has at least 100 words.
+{criteria}
+
+        Provide {len(fields)} binary scores ('yes' or 'no') as follows:
+{scores}
         """
         postability_system = ChatPromptTemplate.from_messages(
             [("system", prompt_template), ("human", "News Article:\n\n{article}")]
         )
         return postability_system | self.llm_postability.with_structured_output(
-            ArticlePostabilityGrader
+            _grader_schema(tuple(fields))
         )
 
+    def _get_postability_grader(self, fields):
+        if fields not in self._postability_graders:
+            self._postability_graders[fields] = self._create_postability_grader(fields)
+        return self._postability_graders[fields]
+
+    def _grading_cache_key(self, state: SharedArticleState) -> str:
+        return json.dumps([self.model_config, state], sort_keys=True)
+
+    def _context(self, state: SharedArticleState, model: str = None) -> str:
+        """The article text sent to ``model``.
+
+        The original article and the researched facts are kept apart in the
+        state. Once the article has been rewritten the draft replaces the
+        original, and facts the draft already states are not repeated.
+        """
+        facts = state.get("facts", [])
+        if not self.compact_context:
+            return " ".join([state["article"], *facts])
+        return compact_article(
+            state.get("final_article") or state["article"],
+            facts,
+            self.context_token_limits.get(model),
+        )
+
+    def _add_fact(self, state: SharedArticleState, fact: str) -> SharedArticleState:
+        facts = state.get("facts", [])
+        if self.compact_context:
+            state["facts"] = facts + dedupe_facts(self._context(state), [fact])
+        else:
+            state["facts"] = facts + [fact]
+        return state
+
+    def _unsettled_fields(self, state: SharedArticleState):
+        if not self.incremental_grading:
+            return GRADED_FIELDS
+        return tuple(field for field in GRADED_FIELDS if state.get(field) != "yes")
+
     async def update_article_state(
         self, state: SharedArticleState
     ) -> SharedArticleState:
-        news_chef = self._create_postability_grader()
-        response = await news_chef.ainvoke({"article": state["article"]})
-        state["off_or_ontopic"] = response.off_or_ontopic
-        state["mentions_market_value"] = response.mentions_market_value
-        state["mentions_current_club"] = response.mentions_current_club
-        state["meets_100_words"] = response.meets_100_words
+        fields = self._unsettled_fields(state)
+        if not fields:
+            return state
+        news_chef = self._get_postability_grader(fields)
+        response = await news_chef.ainvoke(
+            {"article": self._context(state, "news_chef")}
+        )
+        for field in fields:
+            state[field] = getattr(response, field)
         return state
 
+    async def _recall_fact(self, article: str, field: str):
+        if self.memory is None:
+            return None
+        return await self.memory.arecall_fact(article, field)
+
     async def market_value_researcher_node(
         self, state: SharedArticleState
     ) -> SharedArticleState:
-        response = await self.market_value_agent.ainvoke({"article": state["article"]})
-        state["article"] += f" {response['agent_output']}"
-        return state
+        known_fact = await self._recall_fact(state["article"], "market_value")
+        if known_fact:
+            return self._add_fact(state, known_fact)
+        response = await self.market_value_agent.ainvoke(
+            {"article": self._context(state, "market_value")}
+        )
+        return self._add_fact(state, response["agent_output"])
 
     async def current_club_researcher_node(
         self, state: SharedArticleState
     ) -> SharedArticleState:
-        response = await self.current_club_agent.ainvoke({"article": state["article"]})
-        state["article"] += f" {response['agent_output']}"
-        return state
+        known_fact = await self._recall_fact(state["article"], "current_club")
+        if known_fact:
+            return self._add_fact(state, known_fact)
+        response = await self.current_club_agent.ainvoke(
+            {"article": self._context(state, "current_club")}
+        )
+        return self._add_fact(state, response["agent_output"])
 
     async def word_count_rewriter_node(
         self, state: SharedArticleState
     ) -> SharedArticleState:
-        response = await self.text_writer_agent.ainvoke({"article": state["article"]})
-        state["article"] += f" {response['agent_output']}"
+        response = await self.text_writer_agent.ainvoke(
+            {"article": self._context(state, "text_writer")}
+        )
+        if not self.compact_context:
+            # Uncompacted, the draft is sent along with everything before it.
+            state["facts"] = state.get("facts", []) + [response["agent_output"]]
         state["final_article"] = response["agent_output"]
         return state
 
@@ -130,10 +276,14 @@ class NewsWorkflow:
         workflow = StateGraph(
             SharedArticleState, input=InputArticleState, output=OutputFinalArticleState
         )
-        workflow.add_node("news_chef", self.update_article_state)
-        workflow.add_node("market_value_researcher", self.market_value_researcher_node)
-        workflow.add_node("current_club_researcher", self.current_club_researcher_node)
-        workflow.add_node("word_count_rewriter", self.word_count_rewriter_node)
+        nodes = {
+            "news_chef": self.update_article_state,
+            "market_value_researcher": self.market_value_researcher_node,
+            "current_club_researcher": self.current_club_researcher_node,
+            "word_count_rewriter": self.word_count_rewriter_node,
+        }
+        for name, node in nodes.items():
+            workflow.add_node(name, node, cache_policy=self.cache_policies.get(name))
         workflow.set_entry_point("news_chef")
         workflow.add_conditional_edges(
             "news_chef",
@@ -149,7 +299,23 @@ class NewsWorkflow:
         workflow.add_edge("current_club_researcher", "news_chef")
         workflow.add_edge("word_count_rewriter", "news_chef")
 
-        return workflow.compile()
+        return workflow.compile(cache=self.cache)
 
-    async def ainvoke(self, *args, **kwargs):
-        return await self.workflow.ainvoke(*args, **kwargs)
+    async def ainvoke(self, input, *args, **kwargs):
+        if self.single_flight is None or args or kwargs:
+            return await self.workflow.ainvoke(input, *args, **kwargs)
+        # The shared run starts in a fresh context, so it gets the caller's
+        # recursion limit and callbacks explicitly.
+        parent_config = ensure_config()
+        config = {
+            "recursion_limit": parent_config["recursion_limit"],
+            "callbacks": parent_config.get("callbacks"),
+        }
+        key = self.single_flight.key(
+            input["article"], *self.model_config, config["recursion_limit"]
+        )
+        priority = current_priority()
+        return await self.single_flight.do(
+            key,
+            lambda: run_with_priority(priority, self.workflow.ainvoke(input, config)),
+        )
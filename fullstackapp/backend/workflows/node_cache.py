@@ -0,0 +1,192 @@
+import datetime
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Dict, Mapping, Optional, Sequence
+
+from langgraph.cache.base import BaseCache, FullKey, Namespace
+from langgraph.cache.sqlite import SqliteCache
+
+
+def _now() -> float:
+    return datetime.datetime.now(datetime.timezone.utc).timestamp()
+
+
+def _expiry(ttl: Optional[int]) -> Optional[float]:
+    return _now() + ttl if ttl is not None else None
+
+
+class LRUCache(BaseCache):
+    """In-memory node cache holding at most ``max_entries`` results.
+
+    The least recently used entry is evicted first.
+    """
+
+    def __init__(self, max_entries: int = 1024, **kwargs):
+        super().__init__(**kwargs)
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, keys: Sequence[FullKey]) -> Dict[FullKey, object]:
+        with self._lock:
+            now = _now()
+            values = {}
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                encoding, value, expiry = entry
+                if expiry is not None and now >= expiry:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                values[key] = self.serde.loads_typed((encoding, value))
+            return values
+
+    def set(self, pairs: Mapping[FullKey, tuple]) -> None:
+        with self._lock:
+            for key, (value, ttl) in pairs.items():
+                self._entries[key] = (*self.serde.dumps_typed(value), _expiry(ttl))
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        with self._lock:
+            if namespaces is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] in namespaces]:
+                del self._entries[key]
+
+    async def aget(self, keys: Sequence[FullKey]) -> Dict[FullKey, object]:
+        return self.get(keys)
+
+    async def aset(self, pairs: Mapping[FullKey, tuple]) -> None:
+        self.set(pairs)
+
+    async def aclear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        self.clear(namespaces)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class BoundedSqliteCache(SqliteCache):
+    """SQLite node cache that keeps at most ``max_entries`` rows.
+
+    Expired rows go first, then the least recently written ones.
+    """
+
+    def __init__(self, *, path: str, max_entries: int = 10_000, **kwargs):
+        super().__init__(path=path, **kwargs)
+        self.max_entries = max_entries
+        self.evictions = 0
+
+    def set(self, mapping: Mapping[FullKey, tuple]) -> None:
+        super().set(mapping)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM cache WHERE expiry IS NOT NULL AND expiry < ?", (_now(),)
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE rowid IN "
+                    "(SELECT rowid FROM cache ORDER BY rowid LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+                self.evictions += count - self.max_entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class NodeCache(BaseCache):
+    """Node result cache for compiled graphs that counts hits per node.
+
+    Wraps an ``LRUCache`` or ``BoundedSqliteCache``. LangGraph namespaces
+    node entries as ``(..., node_name)``, which is what the metrics are
+    keyed by.
+    """
+
+    def __init__(self, backend: BaseCache):
+        super().__init__(serde=backend.serde)
+        self.backend = backend
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def in_memory(cls, max_entries: int = 1024) -> "NodeCache":
+        return cls(LRUCache(max_entries=max_entries))
+
+    @classmethod
+    def sqlite(cls, path: str, max_entries: int = 10_000) -> "NodeCache":
+        return cls(BoundedSqliteCache(path=path, max_entries=max_entries))
+
+    @classmethod
+    def from_env(cls) -> Optional["NodeCache"]:
+        """Build the cache selected by ``NODE_CACHE`` (unset disables caching)."""
+        backend = os.getenv("NODE_CACHE")
+        max_entries = int(os.getenv("NODE_CACHE_MAX_ENTRIES", 1024))
+        if backend == "memory":
+            return cls.in_memory(max_entries=max_entries)
+        if backend == "sqlite":
+            path = os.getenv("NODE_CACHE_PATH", "node_cache.sqlite")
+            return cls.sqlite(path, max_entries=max_entries)
+        if backend:
+            raise ValueError(f"Unknown NODE_CACHE backend: {backend}")
+        return None
+
+    def _count(self, keys: Sequence[FullKey], found: Mapping[FullKey, object]):
+        with self._lock:
+            for key in keys:
+                node = key[0][-1]
+                if key in found:
+                    self.hits[node] += 1
+                else:
+                    self.misses[node] += 1
+
+    def get(self, keys: Sequence[FullKey]) -> Dict[FullKey, object]:
+        found = self.backend.get(keys)
+        self._count(keys, found)
+        return found
+
+    async def aget(self, keys: Sequence[FullKey]) -> Dict[FullKey, object]:
+        found = await self.backend.aget(keys)
+        self._count(keys, found)
+        return found
+
+    def set(self, pairs: Mapping[FullKey, tuple]) -> None:
+        self.backend.set(pairs)
+
+    async def aset(self, pairs: Mapping[FullKey, tuple]) -> None:
+        await self.backend.aset(pairs)
+
+    def clear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        self.backend.clear(namespaces)
+
+    async def aclear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        await self.backend.aclear(namespaces)
+
+    def metrics(self) -> dict:
+        nodes = {}
+        for node in sorted(set(self.hits) | set(self.misses)):
+            lookups = self.hits[node] + self.misses[node]
+            nodes[node] = {
+                "hits": self.hits[node],
+                "misses": self.misses[node],
+                "hit_rate": round(self.hits[node] / lookups, 4),
+            }
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "max_entries": self.backend.max_entries,
+            "evictions": self.backend.evictions,
+            "nodes": nodes,
+        }
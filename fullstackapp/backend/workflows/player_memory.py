@@ -0,0 +1,245 @@
+import re
+import time
+from typing import Dict, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_openai import ChatOpenAI
+from langgraph.store.base import BaseStore, GetOp, PutOp
+from langgraph.store.memory import InMemoryStore
+from pydantic import BaseModel, Field
+
+from .llm_scheduler import scheduled
+
+PLAYER_NAMESPACE = ("news", "players")
+
+# Capitalised words and runs of them ("Neymar", "Paris Saint-Germain") are
+# the only candidates we look up, so recall never needs an extra LLM call.
+CAPITALISED_RUN = re.compile(r"[A-ZÀ-Ý][\w'’\-]*(?:\s+[A-ZÀ-Ý][\w'’\-]*)*")
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
+
+class PlayerFacts(BaseModel):
+    """Facts about a single player confirmed by an editor."""
+
+    player_name: str = Field(description="Full name of the player")
+    current_club: Optional[str] = Field(
+        default=None, description="The player's current club, if stated"
+    )
+    market_value: Optional[str] = Field(
+        default=None,
+        description="The player's market value including currency, if stated",
+    )
+
+
+class CorrectionFacts(BaseModel):
+    """All player facts stated in an edited article."""
+
+    players: List[PlayerFacts] = Field(default_factory=list)
+
+
+def normalize_player_name(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def changed_sentences(previous: str, edited: str) -> List[str]:
+    """Sentences of ``edited`` that do not appear in ``previous``."""
+    unchanged = {
+        " ".join(sentence.split())
+        for sentence in SENTENCE_BOUNDARY.split(previous or "")
+    }
+    return [
+        sentence
+        for sentence in SENTENCE_BOUNDARY.split(edited.strip())
+        if sentence and " ".join(sentence.split()) not in unchanged
+    ]
+
+
+def candidate_player_names(article: str, max_words: int = 3) -> List[str]:
+    candidates = []
+    for match in CAPITALISED_RUN.finditer(article):
+        words = match.group(0).split()
+        for size in range(1, max_words + 1):
+            for start in range(len(words) - size + 1):
+                key = normalize_player_name(" ".join(words[start : start + size]))
+                if key not in candidates:
+                    candidates.append(key)
+    return candidates
+
+
+def mentioned_names(article: str) -> List[str]:
+    """Normalized capitalised runs of ``article``.
+
+    The first word of a sentence is capitalised anyway, so it is dropped.
+    """
+    names = []
+    for sentence in SENTENCE_BOUNDARY.split(article):
+        for match in CAPITALISED_RUN.finditer(sentence):
+            words = match.group(0).split()
+            if match.start() == len(sentence) - len(sentence.lstrip()):
+                words = words[1:]
+            if words:
+                names.append(normalize_player_name(" ".join(words)))
+    return names
+
+
+def _contains_words(text: str, words: str) -> bool:
+    return f" {words} " in f" {text} "
+
+
+class PlayerMemory:
+    """Cross-thread memory of player facts backed by a LangGraph store.
+
+    Facts live in the ``("news", "players")`` namespace keyed by the
+    normalized player name, so every lookup is a primary-key read.
+    """
+
+    def __init__(
+        self,
+        store: Optional[BaseStore] = None,
+        llm_model="gpt-4o-mini",
+        temperature=0,
+        ttl_minutes: float = 60 * 24 * 30,
+        batch_size: int = 50,
+        llm: BaseChatModel = None,
+    ):
+        self.store = store or InMemoryStore()
+        self.ttl_minutes = ttl_minutes
+        self.batch_size = batch_size
+        self.llm_extractor = scheduled(
+            llm or ChatOpenAI(model=llm_model, temperature=temperature, max_retries=0)
+        )
+
+    def set_store(self, store: BaseStore):
+        self.store = store
+
+    def _create_fact_extractor(self):
+        prompt_template = """
+        You extract facts about football players that an editor stated while correcting a news article.
+        Only the editor's corrections are confirmed. The full article is context, for example to know which player a correction refers to.
+        For every player the corrections state facts about, return the player's full name, the current club and the market value (including the currency).
+        Leave current_club or market_value empty if the corrections do not state them. Do not take facts from the rest of the article and do not guess.
+        """
+        extractor_prompt = ChatPromptTemplate.from_messages(
+            [
+                ("system", prompt_template),
+                (
+                    "human",
+                    "News Article:\n\n{article}\n\nEditor corrections:\n\n{corrections}",
+                ),
+            ]
+        )
+        return extractor_prompt | self.llm_extractor.with_structured_output(
+            CorrectionFacts
+        )
+
+    async def aextract_facts(
+        self, corrections: str, article: Optional[str] = None
+    ) -> List[PlayerFacts]:
+        """Extract the player facts stated in ``corrections`` to ``article``."""
+        extractor = self._create_fact_extractor()
+        response = await extractor.ainvoke(
+            {"article": article or corrections, "corrections": corrections}
+        )
+        return [facts for facts in response.players if facts.player_name.strip()]
+
+    def _is_expired(self, value: dict, now: float) -> bool:
+        if self.ttl_minutes is None:
+            return False
+        return now - value.get("updated_at", 0) > self.ttl_minutes * 60
+
+    def _ttl(self) -> Optional[float]:
+        return self.ttl_minutes if self.store.supports_ttl else None
+
+    async def _abatch(self, ops: list) -> list:
+        results = []
+        for start in range(0, len(ops), self.batch_size):
+            results.extend(
+                await self.store.abatch(ops[start : start + self.batch_size])
+            )
+        return results
+
+    async def _aget_many(self, keys: List[str]) -> Dict[str, dict]:
+        """Read ``keys`` in batches, evicting entries whose TTL has passed."""
+        items = await self._abatch([GetOp(PLAYER_NAMESPACE, key) for key in keys])
+        now = time.time()
+        found, expired = {}, []
+        for key, item in zip(keys, items):
+            if item is None:
+                continue
+            if self._is_expired(item.value, now):
+                expired.append(PutOp(PLAYER_NAMESPACE, key, None))
+            else:
+                found[key] = item.value
+        if expired:
+            await self._abatch(expired)
+        return found
+
+    async def aremember(self, facts: List[PlayerFacts]) -> None:
+        """Merge ``facts`` into memory with one batched read and one batched write."""
+        merged: Dict[str, dict] = {}
+        for fact in facts:
+            key = normalize_player_name(fact.player_name)
+            entry = merged.setdefault(key, {"player_name": fact.player_name.strip()})
+            if fact.current_club:
+                entry["current_club"] = fact.current_club
+            if fact.market_value:
+                entry["market_value"] = fact.market_value
+        merged = {
+            key: entry
+            for key, entry in merged.items()
+            if "current_club" in entry or "market_value" in entry
+        }
+        if not merged:
+            return
+
+        existing = await self._aget_many(list(merged))
+        now = time.time()
+        ops = []
+        for key, entry in merged.items():
+            value = {**existing.get(key, {}), **entry, "updated_at": now}
+            ops.append(
+                PutOp(PLAYER_NAMESPACE, key, value, index=False, ttl=self._ttl())
+            )
+        await self._abatch(ops)
+
+    async def arecall(self, article: str) -> List[dict]:
+        """Return remembered facts for every known player mentioned in ``article``."""
+        candidates = candidate_player_names(article)
+        if not candidates:
+            return []
+        found = await self._aget_many(candidates)
+        return [found[key] for key in candidates if key in found]
+
+    async def arecall_subject(self, article: str) -> Optional[dict]:
+        """Return the facts of the player ``article`` is about, if that is unambiguous.
+
+        Exactly one remembered player has to be mentioned, and every other
+        name in the article has to be part of that player's name or club.
+        Otherwise another player may be the subject and nothing is recalled.
+        """
+        found = await self.arecall(article)
+        if len(found) != 1:
+            return None
+        (facts,) = found
+        known = [
+            normalize_player_name(facts["player_name"]),
+            normalize_player_name(facts.get("current_club") or ""),
+        ]
+        for name in mentioned_names(article):
+            if not any(_contains_words(text, name) for text in known):
+                return None
+        return facts
+
+    async def arecall_fact(self, article: str, field: str) -> Optional[str]:
+        """Return a sentence stating ``field`` for the article's player, if known."""
+        facts = await self.arecall_subject(article)
+        if facts is None:
+            return None
+        if field == "market_value" and facts.get("market_value"):
+            return f"{facts['player_name']}'s market value is {facts['market_value']}."
+        if field == "current_club" and facts.get("current_club"):
+            return (
+                f"{facts['player_name']} currently plays for {facts['current_club']}."
+            )
+        return None
@@ -0,0 +1,66 @@
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+def normalize_article(article: str) -> str:
+    """Default key normalization: ignore surrounding and repeated whitespace."""
+    return " ".join(article.split())
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share the same key into one execution.
+
+    The first caller starts the work as a detached task; callers arriving
+    while it is in flight await the same task. The task is only cancelled
+    once every caller waiting on it has gone away.
+    """
+
+    def __init__(self, normalize: Callable[[str], Hashable] = normalize_article):
+        self.normalize = normalize
+        self.executions = 0
+        self.coalesced = 0
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def key(self, article: str, *config: Hashable) -> Hashable:
+        return (self.normalize(article), *config)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled():
+            # Mark the exception as retrieved when every waiter already left.
+            call.task.exception()
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            # A fresh context keeps the shared run independent of the graph
+            # run of whichever caller happened to arrive first.
+            task = asyncio.get_running_loop().create_task(
+                func(), context=contextvars.Context()
+            )
+            call = _Call(task)
+            self._calls[key] = call
+            task.add_done_callback(lambda _: self._forget(key, call))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            result = await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+        return dict(result) if isinstance(result, dict) else result
@@ -1,9 +1,12 @@
 from typing import TypedDict
 
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from langgraph.graph import END, START, StateGraph
 
+from .llm_scheduler import scheduled
+
 
 class InputState(TypedDict):
     article: str
@@ -17,8 +20,10 @@ class OverallState(InputState, OutputState):
     pass
 
 
-def create_text_writer_agent():
-    model_text_writer = ChatOpenAI(model="gpt-4o-mini")
+def create_text_writer_agent(llm: BaseChatModel = None):
+    model_text_writer = scheduled(
+        llm or ChatOpenAI(model="gpt-4o-mini", max_retries=0)
+    )
 
     async def expand_text_to_100_words(state: OverallState):
         human_message = HumanMessage(content=state["article"])